@@ -0,0 +1,135 @@
+"""
+백로그/스프린트 채널 리듀서별 체크포인트 크기와 쓰기 시간 벤치마크.
+
+"수정 요청" 이 반복되는 스레드를 흉내 낸다. 매 라운드 에이전트가 전체 백로그 목록을
+다시 출력하고(일부 항목만 수정), 일정 주기로 항목 하나를 삭제한다.
+
+  - append: 기존 operator.add 리스트 (라운드마다 전체 목록이 다시 붙음)
+  - upsert: upsert_by_key (키 단위 upsert, 삭제는 tombstone)
+
+사용법: python benchmarks/checkpoint_size.py [--rounds 50] [--items 30] [--delete-every 10]
+"""
+import argparse
+import asyncio
+import operator
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Annotated, Dict, List, TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import StateGraph
+
+from graph.structured_state import TOMBSTONE, live_items, upsert_by_key
+
+class AppendState(TypedDict):
+    revision: tuple
+    backlogs: Annotated[List[dict], operator.add]
+
+class UpsertState(TypedDict):
+    revision: tuple
+    backlogs: Annotated[Dict[str, dict], upsert_by_key]
+
+def backlog(index: int, revision: int) -> dict:
+    return {
+        "title": f"백로그 {index}",
+        "description": f"설명 {index} (rev {revision}) " + "x" * 300,
+        "priority": index % 5 + 1,
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-14",
+        "status": "TODO",
+    }
+
+def revision(round_: int, items: int, delete_every: int) -> tuple[List[dict], List[str]]:
+    """라운드마다 3개 항목을 수정하고 delete_every 라운드마다 하나씩 지운 전체 목록을 만든다."""
+    deleted_count = round_ // delete_every if delete_every else 0
+    deleted = [f"백로그 {i}" for i in range(deleted_count)]
+    backlogs = [
+        backlog(i, round_ if i % 10 in (round_ % 10, (round_ + 1) % 10, (round_ + 2) % 10) else 0)
+        for i in range(deleted_count, items)
+    ]
+
+    return backlogs, deleted
+
+def build_graph(mode: str, checkpointer):
+    def revise(state):
+        backlogs, deleted = state["revision"]
+
+        if mode == "append":
+            return {"backlogs": backlogs}
+
+        update = {item["title"]: item for item in backlogs}
+        update.update({title: TOMBSTONE for title in deleted if title not in update})
+
+        return {"backlogs": update}
+
+    graph = StateGraph(AppendState if mode == "append" else UpsertState)
+    graph.add_node("revise", revise)
+    graph.set_entry_point("revise")
+
+    return graph.compile(checkpointer=checkpointer)
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def run_mode(mode: str, rounds: int, items: int, delete_every: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite")
+
+        async with aiosqlite.connect(db_path) as conn:
+            saver = AsyncSqliteSaver(conn)
+            graph = build_graph(mode, saver)
+            config = {"configurable": {"thread_id": "bench"}}
+            writes: List[float] = []
+
+            for round_ in range(rounds):
+                started = time.perf_counter()
+                await graph.ainvoke({"revision": revision(round_, items, delete_every)}, config)
+                writes.append(time.perf_counter() - started)
+
+            checkpoint_tuple = await saver.aget_tuple(config)
+            backlogs = checkpoint_tuple.checkpoint["channel_values"]["backlogs"]
+            # 입력으로 넣은 revision 채널은 두 방식이 같으므로 백로그 채널만 잰다.
+            checkpoint_bytes = len(saver.serde.dumps_typed(backlogs)[1])
+            live = len(backlogs) if mode == "append" else len(live_items(backlogs))
+
+        db_bytes = sum(
+            os.path.getsize(os.path.join(tmp, name))
+            for name in os.listdir(tmp) if name.startswith("bench.sqlite")
+        )
+
+    return {
+        "mode": mode,
+        "items": live,
+        "checkpoint_kb": checkpoint_bytes / 1024,
+        "db_kb": db_bytes / 1024,
+        "write_p50_ms": statistics.median(writes) * 1000,
+        "write_p99_ms": percentile(writes, 0.99) * 1000,
+        "write_last_ms": writes[-1] * 1000,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50, help="수정 라운드 수")
+    parser.add_argument("--items", type=int, default=30, help="백로그 항목 수")
+    parser.add_argument("--delete-every", type=int, default=10, help="항목 하나를 삭제하는 라운드 주기 (0=삭제 안 함)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'items':>7}{'ckpt':>11}{'db':>11}{'write p50':>11}{'write p99':>11}{'last':>10}")
+
+    for mode in ["append", "upsert"]:
+        r = await run_mode(mode, args.rounds, args.items, args.delete_every)
+        print(
+            f"{r['mode']:<8}{r['items']:>7}{r['checkpoint_kb']:>9.1f}KB{r['db_kb']:>9.1f}KB"
+            f"{r['write_p50_ms']:>9.2f}ms{r['write_p99_ms']:>9.2f}ms{r['write_last_ms']:>8.2f}ms"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
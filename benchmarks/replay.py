@@ -0,0 +1,228 @@
+"""
+오프라인 벤치마크용 재생 모델과 로컬 MCP 스텁 서버.
+
+  - ReplayChatModel: 시나리오에 기록된 응답을 그래프 노드(Supervisor, BacklogAgent ...)별로
+    순서대로 돌려주는 채팅 모델. 스레드마다 따로 재생하므로 같은 시나리오를 동시에 돌릴 수 있다.
+  - start_mcp_stub: 메모리에 프로젝트/백로그/스프린트를 들고 있는 streamable HTTP MCP 서버.
+
+응답 형식 (test_cases.json 의 "llm" 항목)
+  "텍스트"                                   일반 답변
+  {"route": "BacklogAgent", "project_ids": []}  Supervisor 라우팅 결과
+  {"tool_calls": [{"name": "...", "args": {...}}], "content": ""}
+  {"structured": "BacklogOutput", "args": {...}}  에이전트의 구조화된 출력
+  모든 형식에 "latency_ms", "usage": {"input_tokens": .., "output_tokens": ..} 를 붙일 수 있다.
+
+시나리오 검증 (test_cases.json 의 "expect" 항목)
+  {"backlog_titles": {"p1": ["..."]}}  시나리오가 끝난 뒤 프로젝트의 백로그 제목 집합이 정확히 이 목록이어야 한다.
+"""
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from usage import node_of
+
+# 스크립트가 바닥났을 때 노드별 기본 응답
+DEFAULT_REPLIES = {
+    "Supervisor": {"route": "FINISH"},
+}
+DEFAULT_REPLY = "완료했습니다."
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class ReplayChatModel(BaseChatModel):
+    """노드별로 기록된 응답을 재생한다. bind_tools / with_structured_output 은 그대로 통과시킨다."""
+    latency_ms: float = 0.0
+
+    _scripts: Dict[Tuple[str, str], Deque[Any]] = PrivateAttr(default_factory=dict)
+    _calls: Dict[str, int] = PrivateAttr(default_factory=lambda: defaultdict(int))
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def load(self, thread_id: str, script: Dict[str, List[Any]]):
+        for node, replies in (script or {}).items():
+            self._scripts[(thread_id, node)] = deque(replies)
+
+    def calls(self, thread_id: str) -> int:
+        return self._calls.get(thread_id, 0)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        return self
+
+    def _next_reply(self, thread_id: str, node: str) -> Any:
+        script = self._scripts.get((thread_id, node))
+
+        if script:
+            return script.popleft()
+
+        return DEFAULT_REPLIES.get(node, DEFAULT_REPLY)
+
+    def _message(self, reply: Any, messages: List[BaseMessage]) -> AIMessage:
+        if isinstance(reply, str):
+            reply = {"content": reply}
+
+        tool_calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call_{uuid.uuid4().hex[:12]}"}
+            for call in reply.get("tool_calls", [])
+        ]
+
+        if "route" in reply:
+            tool_calls.append({
+                "name": "RouteResponse",
+                "args": {"reason": "replay", "next": reply["route"], "project_ids": reply.get("project_ids", [])},
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+            })
+
+        if "structured" in reply:
+            tool_calls.append({
+                "name": reply["structured"],
+                "args": reply.get("args", {}),
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+            })
+
+        content = reply.get("content", "")
+        prompt = "".join(str(message.content) for message in messages)
+        output = content + json.dumps([call["args"] for call in tool_calls], ensure_ascii=False)
+        usage = reply.get("usage") or {}
+        input_tokens = usage.get("input_tokens", _estimate_tokens(prompt))
+        output_tokens = usage.get("output_tokens", _estimate_tokens(output))
+
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            response_metadata={"model_name": "replay"},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError("ReplayChatModel 은 비동기로만 실행한다.")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        metadata = getattr(run_manager, "metadata", None) or {}
+        thread_id = metadata.get("thread_id", "")
+        reply = self._next_reply(thread_id, node_of(metadata))
+        self._calls[thread_id] += 1
+
+        latency = reply.get("latency_ms", self.latency_ms) if isinstance(reply, dict) else self.latency_ms
+
+        if latency:
+            await asyncio.sleep(latency / 1000)
+
+        return ChatResult(generations=[ChatGeneration(message=self._message(reply, messages))])
+
+class _Store:
+    """MCP 스텁이 들고 있는 데이터. 스레드 안전하게 접근한다."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def backlog_titles(self, project_id: str) -> List[str]:
+        with self.lock:
+            return sorted({backlog["title"] for backlog in self.backlogs[project_id].values()})
+
+    def reset(self):
+        """시나리오마다 같은 데이터에서 시작하도록 초기 상태로 되돌린다."""
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.projects = {
+            "p1": {"id": "p1", "name": "스포티파이 클론", "workspace_id": "w1"},
+            "p2": {"id": "p2", "name": "사내 위키", "workspace_id": "w1"},
+        }
+        self.backlogs: Dict[str, Dict[str, dict]] = defaultdict(dict)
+        self.backlogs["p2"] = {
+            "b-wiki-1": {"id": "b-wiki-1", "title": "문서 검색", "description": "제목/본문 검색", "priority": 1},
+            "b-wiki-2": {"id": "b-wiki-2", "title": "문서 버전 관리", "description": "수정 이력 보기", "priority": 2},
+        }
+        self.sprints: Dict[str, Dict[str, dict]] = defaultdict(dict)
+
+def start_mcp_stub(latency_ms: float = 0.0) -> Tuple[str, _Store, Any]:
+    """(MCP URL, 데이터 저장소, uvicorn 서버) 를 반환한다. 데몬 스레드에서 돈다."""
+    import uvicorn
+    from mcp.server.fastmcp import FastMCP
+
+    store = _Store()
+    mcp = FastMCP("zenior-stub", stateless_http=True)
+
+    def record(name: str):
+        with store.lock:
+            store.calls[name] += 1
+
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+    @mcp.tool()
+    def get_projects(workspace_id: str = "w1") -> str:
+        """List projects in a workspace."""
+        record("get_projects")
+        return json.dumps([p for p in store.projects.values() if p["workspace_id"] == workspace_id], ensure_ascii=False)
+
+    @mcp.tool()
+    def get_project(project_id: str) -> str:
+        """Get a project by ID."""
+        record("get_project")
+        return json.dumps(store.projects.get(project_id), ensure_ascii=False)
+
+    @mcp.tool()
+    def get_backlogs(project_id: str) -> str:
+        """List backlogs of a project."""
+        record("get_backlogs")
+        return json.dumps(list(store.backlogs[project_id].values()), ensure_ascii=False)
+
+    @mcp.tool()
+    def create_backlog(project_id: str, title: str, description: str = "", priority: int = 3) -> str:
+        """Create a backlog item."""
+        record("create_backlog")
+        backlog = {"id": f"b{uuid.uuid4().hex[:8]}", "title": title, "description": description, "priority": priority}
+        with store.lock:
+            store.backlogs[project_id][backlog["id"]] = backlog
+        return json.dumps(backlog, ensure_ascii=False)
+
+    @mcp.tool()
+    def get_sprints(project_id: str) -> str:
+        """List sprints of a project."""
+        record("get_sprints")
+        return json.dumps(list(store.sprints[project_id].values()), ensure_ascii=False)
+
+    @mcp.tool()
+    def create_sprint(project_id: str, name: str, sprint_number: int, start_date: str, end_date: str) -> str:
+        """Create a sprint."""
+        record("create_sprint")
+        sprint = {"id": f"s{uuid.uuid4().hex[:8]}", "name": name, "sprint_number": sprint_number,
+                  "start_date": start_date, "end_date": end_date}
+        with store.lock:
+            store.sprints[project_id][sprint["id"]] = sprint
+        return json.dumps(sprint, ensure_ascii=False)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(mcp.streamable_http_app(), host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}/mcp", store, server
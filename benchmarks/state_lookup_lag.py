@@ -0,0 +1,142 @@
+"""
+chat_endpoint 의 재개(resume) 판별 방식별 이벤트 루프 지연 벤치마크.
+
+동시에 여러 스트림이 토큰을 흘려보내는 동안 각 턴마다 스레드 상태를 조회하고,
+5ms 주기 타이머가 얼마나 늦게 깨어나는지(이벤트 루프 지연)를 측정한다.
+
+  - get_state: 동기 SqliteSaver + graph.get_state (이벤트 루프를 막음)
+  - aget_state: AsyncSqliteSaver + graph.aget_state
+  - pending: AsyncSqliteSaver + has_pending_interrupt (pending write 만 조회)
+
+사용법: python benchmarks/state_lookup_lag.py [--streams 20] [--turns 10] [--messages 400]
+"""
+import argparse
+import asyncio
+import operator
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Annotated, List, TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import aiosqlite
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import StateGraph
+
+from graph.checkpointer import has_pending_interrupt
+
+TICK = 0.005
+
+class BenchState(TypedDict):
+    messages: Annotated[List[str], operator.add]
+
+def build_graph(checkpointer):
+    def respond(state: BenchState):
+        return {"messages": ["assistant " + "x" * 2000]}
+
+    graph = StateGraph(BenchState)
+    graph.add_node("respond", respond)
+    graph.set_entry_point("respond")
+
+    return graph.compile(checkpointer=checkpointer)
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def seed(db_path: str, streams: int, messages: int):
+    async with aiosqlite.connect(db_path) as conn:
+        graph = build_graph(AsyncSqliteSaver(conn))
+        history = ["user " + "y" * 2000] * messages
+
+        for i in range(streams):
+            await graph.ainvoke({"messages": history}, {"configurable": {"thread_id": f"thread-{i}"}})
+
+async def monitor_lag(lags: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+async def run_mode(mode: str, db_path: str, streams: int, turns: int) -> dict:
+    lags: List[float] = []
+    lookups: List[float] = []
+    stop = asyncio.Event()
+
+    if mode == "get_state":
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        graph = build_graph(SqliteSaver(conn))
+    else:
+        conn = await aiosqlite.connect(db_path)
+        graph = build_graph(AsyncSqliteSaver(conn))
+
+    async def lookup(config):
+        if mode == "get_state":
+            return graph.get_state(config).next
+        if mode == "aget_state":
+            return (await graph.aget_state(config)).next
+
+        return await has_pending_interrupt(graph.checkpointer, config)
+
+    async def stream(i: int):
+        config = {"configurable": {"thread_id": f"thread-{i}"}}
+
+        for _ in range(turns):
+            started = time.perf_counter()
+            await lookup(config)
+            lookups.append(time.perf_counter() - started)
+
+            # 토큰 스트리밍 흉내
+            for _ in range(20):
+                await asyncio.sleep(0.001)
+
+    monitor = asyncio.create_task(monitor_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(stream(i) for i in range(streams)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    if mode == "get_state":
+        conn.close()
+    else:
+        await conn.close()
+
+    return {
+        "mode": mode,
+        "wall_s": elapsed,
+        "lookup_p50_ms": statistics.median(lookups) * 1000,
+        "lookup_p99_ms": percentile(lookups, 0.99) * 1000,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": percentile(lags, 0.99) * 1000,
+        "lag_max_ms": max(lags) * 1000,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=20, help="동시 스트림 수")
+    parser.add_argument("--turns", type=int, default=10, help="스트림당 턴 수")
+    parser.add_argument("--messages", type=int, default=400, help="스레드당 메시지 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite")
+        await seed(db_path, args.streams, args.messages)
+
+        print(f"{'mode':<12}{'wall(s)':>9}{'lookup p50':>12}{'lookup p99':>12}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}")
+
+        for mode in ["get_state", "aget_state", "pending"]:
+            r = await run_mode(mode, db_path, args.streams, args.turns)
+            print(
+                f"{r['mode']:<12}{r['wall_s']:>9.2f}{r['lookup_p50_ms']:>10.2f}ms{r['lookup_p99_ms']:>10.2f}ms"
+                f"{r['lag_p50_ms']:>8.2f}ms{r['lag_p99_ms']:>8.2f}ms{r['lag_max_ms']:>8.2f}ms"
+            )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -67,6 +67,7 @@ const SelectWorkspaceToolUI = makeAssistantToolUI<
 
 type State = {
   messages: LangChainMessage[];
+  stateVersion?: number;
 };
 
 const LangChainMessageConverter = createMessageConverter(
@@ -135,7 +136,12 @@ function App() {
     },
     body: {
       threadId: threadId,
-    }
+    },
+    // 서버가 스레드 상태를 보관하므로 전체 상태 대신 마지막으로 받은 버전만 보낸다.
+    prepareSendCommandsRequest: ({ state, ...body }: { state?: State } & Record<string, unknown>) => ({
+      ...body,
+      stateVersion: state?.stateVersion ?? null,
+    }),
   }), [token, threadId])
 
   const runtime = useAssistantTransportRuntime({
@@ -1,45 +1,218 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import httpx
 from jose import JWTError, jwt, jwk
-import requests
+from jose.backends.base import Key
 import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from dotenv import load_dotenv
 
-load_dotenv()
+from metrics import span
 
-# caching jwks
-_jwks = None
+load_dotenv()
 
 COGNITO_REGION = os.getenv("COGNITO_REGION")
 COGNITO_USER_POOL_ID = os.getenv("COGNITO_USER_POOL_ID")
 COGNITO_CLIENT_ID = os.getenv("COGNITO_CLIENT_ID")
 COGNITO_ISSUER = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}"
+# 로컬/테스트에서는 JWKS 파일 경로(file://...)나 스텁 서버 URL 로 대체할 수 있다.
+COGNITO_JWKS_URL = os.getenv("COGNITO_JWKS_URL") or COGNITO_ISSUER + "/.well-known/jwks.json"
+# 이 시간(초)이 지나면 기존 키로 계속 검증하면서 백그라운드에서 다시 받아온다.
+JWKS_TTL = float(os.getenv("COGNITO_JWKS_TTL", "3600"))
+# 모르는 kid 로 다시 받아왔는데도 없으면 이 시간(초) 동안은 다시 받아오지 않는다.
+JWKS_NEGATIVE_TTL = float(os.getenv("COGNITO_JWKS_NEGATIVE_TTL", "60"))
+# kid 와 관계없이 모르는 kid 때문에 다시 받아오는 간격(초)의 최소값. 그 전에는 모르는 kid 를 바로 거부한다.
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("COGNITO_JWKS_MIN_REFRESH_INTERVAL", "30"))
+# 검증이 끝난 토큰의 claims 를 만료 시각까지 보관하는 LRU 캐시 크기
+TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
 
 security = HTTPBearer(auto_error=False)
 
-def get_jwks():
-    global _jwks
-    if _jwks is None:
-        jwks_url = COGNITO_ISSUER + "/.well-known/jwks.json"
-        _jwks = requests.get(jwks_url).json()
-    return _jwks
+class JWKSCache:
+    """
+        kid 로 색인된 RSA 공개키 캐시.
+        키는 받아올 때 한 번만 파싱하고, 동시에 들어온 갱신 요청은 하나로 합친다.
+    """
+    def __init__(
+        self,
+        url: str,
+        ttl: float = JWKS_TTL,
+        negative_ttl: float = JWKS_NEGATIVE_TTL,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_INTERVAL,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at = 0.0
+        self._unknown_kids: Dict[str, float] = {}
+        self._unknown_refreshed_at = float("-inf")
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _fetch(self) -> dict:
+        parsed = urlparse(self.url)
+
+        if parsed.scheme in ("", "file"):
+            path = parsed.path if parsed.scheme == "file" else self.url
+
+            def read():
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+
+            return await asyncio.to_thread(read)
+
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+
+            return response.json()
+
+    async def _load(self):
+        jwks = await self._fetch()
+        keys = {}
+
+        for key in jwks.get("keys", []):
+            try:
+                keys[key["kid"]] = jwk.construct(key, key.get("alg", "RS256"))
+            except Exception as e:
+                print(f"⚠️  Warning: Skipping invalid JWK {key.get('kid')}: {e}")
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        self._unknown_kids.clear()
+
+    def refresh(self) -> asyncio.Task:
+        """진행 중인 갱신이 있으면 그 태스크를 공유한다."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._load())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️  Warning: JWKS refresh failed: {task.exception()}")
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        if not self._fetched_at:
+            await asyncio.shield(self.refresh())
+        elif time.monotonic() - self._fetched_at > self.ttl:
+            self.refresh()
+
+        key = self._keys.get(kid)
+
+        if key is not None:
+            return key
+
+        failed_at = self._unknown_kids.get(kid)
+        if failed_at is not None and time.monotonic() - failed_at < self.negative_ttl:
+            return None
+
+        # kid 를 바꿔 가며 보내는 요청이 매번 JWKS 를 다시 받게 하지 못하도록 전체 간격을 제한한다.
+        if time.monotonic() - self._unknown_refreshed_at < self.min_refresh_interval:
+            return None
+
+        self._unknown_refreshed_at = time.monotonic()
+
+        # 키가 교체되었을 수 있으므로 한 번 다시 받아온다.
+        try:
+            await asyncio.shield(self.refresh())
+        except Exception:
+            pass
+
+        key = self._keys.get(kid)
+
+        if key is None:
+            self._unknown_kids[kid] = time.monotonic()
+
+        return key
+
+class VerifiedTokenCache:
+    """
+        RS256 검증 결과는 토큰이 만료될 때까지 변하지 않으므로
+        토큰 해시를 키로 claims 를 보관해 같은 토큰의 재검증을 건너뛴다.
+    """
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self._key(token)
+        payload = self._entries.get(key)
+
+        if payload is not None and payload.get("exp", 0) > time.time():
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return payload
+
+        if payload is not None:
+            del self._entries[key]
+
+        self.misses += 1
+
+        return None
+
+    def put(self, token: str, payload: dict):
+        if self.max_size <= 0 or "exp" not in payload:
+            return
+
+        key = self._key(token)
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+jwks_cache = JWKSCache(COGNITO_JWKS_URL)
+token_cache = VerifiedTokenCache()
 
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    
+    with span("auth") as stage:
+        return await _verify_token(credentials.credentials, stage)
+
+async def _verify_token(token: str, stage: dict):
+    stage["name"] = "cache"
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    stage["name"] = "verify"
+
     try:
         unverified_header = jwt.get_unverified_header(token)
-        
-        jwks = get_jwks()
-        rsa_key = next(
-            (key for key in jwks["keys"] if key["kid"] == unverified_header["kid"]),
-            None
-        )
-        
+
+        try:
+            rsa_key = await jwks_cache.get_key(unverified_header["kid"])
+        except Exception:
+            raise HTTPException(status_code=503, detail="Unable to fetch signing keys")
+
         if not rsa_key:
             raise HTTPException(status_code=401, detail="Public key not found")
-        
+
         payload = jwt.decode(
             token,
             rsa_key,
@@ -47,11 +220,13 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(secur
             audience=COGNITO_CLIENT_ID,
             issuer=COGNITO_ISSUER
         )
-        
+
+        token_cache.put(token, payload)
+
         return payload
-        
+
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
-        )
\ No newline at end of file
+        )
@@ -1,7 +1,26 @@
 from .create_supervisor import create_team_supervisor
 from .scrum_agent import create_scrum_agent_graph
+from .registry import get_scrum_agent_graph, reset_scrum_agent_graph
+from .checkpointer import open_checkpointer, close_checkpointer, get_checkpointer, has_pending_interrupt
+from .retention import start_checkpoint_compaction, stop_checkpoint_compaction, get_checkpoint_retention
+from .router import pre_route, get_router_stats
+from .loop_guard import run_deadline
+from .speculation import discard_pending
 
 __all__ = [
   "create_team_supervisor", 
   "create_scrum_agent_graph", 
+  "get_scrum_agent_graph",
+  "reset_scrum_agent_graph",
+  "open_checkpointer",
+  "close_checkpointer",
+  "get_checkpointer",
+  "has_pending_interrupt",
+  "start_checkpoint_compaction",
+  "stop_checkpoint_compaction",
+  "get_checkpoint_retention",
+  "pre_route",
+  "get_router_stats",
+  "run_deadline",
+  "discard_pending",
 ]
\ No newline at end of file
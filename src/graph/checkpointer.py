@@ -0,0 +1,177 @@
+import os
+from contextlib import AsyncExitStack
+from typing import Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import RunnableConfig
+from langgraph.checkpoint.memory import MemorySaver
+
+from dotenv import load_dotenv
+
+from .retention import CHECKPOINT_THREAD_TTL
+
+load_dotenv()
+
+# memory | sqlite | postgres | redis
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "memory").lower()
+# sqlite 는 파일 경로, postgres/redis 는 접속 URL
+CHECKPOINTER_URL = os.getenv("CHECKPOINTER_URL")
+CHECKPOINTER_POOL_SIZE = int(os.getenv("CHECKPOINTER_POOL_SIZE", "10"))
+
+# interrupt() 로 멈춘 태스크가 남기는 pending write 채널 이름
+INTERRUPT_CHANNEL = "__interrupt__"
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_exit_stack: Optional[AsyncExitStack] = None
+
+def _require(module: str, extra: str):
+    raise RuntimeError(
+        f"CHECKPOINTER_BACKEND={CHECKPOINTER_BACKEND} requires '{module}'. "
+        f"Install it with `pip install -e .[{extra}]`."
+    )
+
+async def _open_sqlite(stack: AsyncExitStack) -> BaseCheckpointSaver:
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        _require("langgraph-checkpoint-sqlite", "sqlite")
+
+    conn = await stack.enter_async_context(
+        aiosqlite.connect(CHECKPOINTER_URL or "checkpoints.sqlite")
+    )
+    # 여러 워커가 같은 파일을 읽는 동안에도 쓰기가 막히지 않도록 WAL 모드를 쓴다.
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("PRAGMA busy_timeout=5000")
+
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+
+    return saver
+
+async def _open_postgres(stack: AsyncExitStack) -> BaseCheckpointSaver:
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError:
+        _require("langgraph-checkpoint-postgres", "postgres")
+
+    if not CHECKPOINTER_URL:
+        raise RuntimeError("CHECKPOINTER_URL must be set for the postgres checkpointer")
+
+    pool = AsyncConnectionPool(
+        conninfo=CHECKPOINTER_URL,
+        max_size=CHECKPOINTER_POOL_SIZE,
+        kwargs={
+            "autocommit": True,
+            "prepare_threshold": 0,
+            "row_factory": dict_row,
+        },
+        open=False,
+    )
+    await pool.open()
+    stack.push_async_callback(pool.close)
+
+    saver = AsyncPostgresSaver(pool)
+    await saver.setup()
+
+    return saver
+
+async def _open_redis(stack: AsyncExitStack) -> BaseCheckpointSaver:
+    try:
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+    except ImportError:
+        _require("langgraph-checkpoint-redis", "redis")
+
+    if not CHECKPOINTER_URL:
+        raise RuntimeError("CHECKPOINTER_URL must be set for the redis checkpointer")
+
+    saver = await stack.enter_async_context(
+        AsyncRedisSaver.from_conn_string(
+            CHECKPOINTER_URL,
+            connection_args={"max_connections": CHECKPOINTER_POOL_SIZE},
+            # Redis 는 보존 기간을 키 TTL(분 단위)로 처리한다.
+            ttl={
+                "default_ttl": CHECKPOINT_THREAD_TTL / 60,
+                "refresh_on_read": True,
+            } if CHECKPOINT_THREAD_TTL > 0 else None,
+        )
+    )
+    await saver.asetup()
+
+    return saver
+
+_BACKENDS = {
+    "sqlite": _open_sqlite,
+    "postgres": _open_postgres,
+    "redis": _open_redis,
+}
+
+async def open_checkpointer() -> BaseCheckpointSaver:
+    """
+        CHECKPOINTER_BACKEND 에 맞는 체크포인터를 열어 프로세스 전역으로 등록한다.
+        서버 시작 시 그래프를 컴파일하기 전에 호출해야 한다.
+    """
+    global _checkpointer, _exit_stack
+
+    if _checkpointer is not None:
+        return _checkpointer
+
+    if CHECKPOINTER_BACKEND == "memory":
+        _checkpointer = MemorySaver()
+
+        return _checkpointer
+
+    if CHECKPOINTER_BACKEND not in _BACKENDS:
+        raise RuntimeError(f"Unknown CHECKPOINTER_BACKEND: {CHECKPOINTER_BACKEND}")
+
+    stack = AsyncExitStack()
+
+    try:
+        _checkpointer = await _BACKENDS[CHECKPOINTER_BACKEND](stack)
+    except BaseException:
+        await stack.aclose()
+        raise
+
+    _exit_stack = stack
+    print(f"✓ Using {CHECKPOINTER_BACKEND} checkpointer")
+
+    return _checkpointer
+
+async def close_checkpointer():
+    global _checkpointer, _exit_stack
+
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+
+    _checkpointer = None
+    _exit_stack = None
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """열려 있는 체크포인터를 반환한다. memory 백엔드는 필요할 때 바로 만든다."""
+    global _checkpointer
+
+    if _checkpointer is None:
+        if CHECKPOINTER_BACKEND != "memory":
+            raise RuntimeError("Checkpointer is not open. Call open_checkpointer() at startup.")
+
+        _checkpointer = MemorySaver()
+
+    return _checkpointer
+
+async def has_pending_interrupt(checkpointer: BaseCheckpointSaver, config: RunnableConfig) -> bool:
+    """
+        스레드가 interrupt() 로 멈춰 재개를 기다리는지 확인한다.
+        aget_state 와 달리 채널 값을 복원하거나 다음 태스크를 계산하지 않고
+        최신 체크포인트의 pending write 만 읽는다.
+    """
+    checkpoint_tuple = await checkpointer.aget_tuple(config)
+
+    if checkpoint_tuple is None:
+        return False
+
+    return any(
+        channel == INTERRUPT_CHANNEL
+        for _, channel, _ in checkpoint_tuple.pending_writes or []
+    )
@@ -0,0 +1,167 @@
+import os
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langgraph.constants import TAG_HIDDEN, TAG_NOSTREAM
+from langgraph.graph.state import RunnableConfig
+
+from dotenv import load_dotenv
+
+from .structured_state import STRUCTURED_OUTPUT_KEY, summarize_structured
+
+load_dotenv()
+
+# 요약하지 않고 그대로 넘기는 최근 턴 수. 0 이면 요약하지 않는다.
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "6"))
+# 오래된 턴이 이만큼 쌓이면 한 번에 요약한다. 매 턴마다 요약 호출이 일어나지 않게 한다.
+CONTEXT_SUMMARY_BATCH = int(os.getenv("CONTEXT_SUMMARY_BATCH", "3"))
+# 이보다 긴 툴 결과는 참조로 바꾼다(문자 수).
+CONTEXT_TOOL_PAYLOAD_LIMIT = int(os.getenv("CONTEXT_TOOL_PAYLOAD_LIMIT", "2000"))
+CONTEXT_SUMMARY_MODEL = os.getenv("CONTEXT_SUMMARY_MODEL", "gpt-4o-mini")
+
+# 역할별 뷰 설정. current_tool_payloads 가 False 면 이번 턴의 툴 결과도 참조로 바꾼다.
+ROLE_VIEWS: Dict[str, Dict[str, Any]] = {
+    # Supervisor 는 다음 담당자만 고르므로 툴 결과 원문이 필요 없다.
+    "Supervisor": {"current_tool_payloads": False},
+}
+DEFAULT_VIEW = {"current_tool_payloads": True}
+
+def _text(message: BaseMessage) -> str:
+    return message.text if isinstance(message.text, str) else message.text()
+
+def _unsummarized(state: Dict[str, Any]) -> List[BaseMessage]:
+    """요약에 이미 포함된 메시지를 제외한 나머지를 반환한다."""
+    messages = state["messages"]
+    until = state.get("context_summary_until")
+
+    if until is None:
+        return list(messages)
+
+    for index, message in enumerate(messages):
+        if message.id == until:
+            return list(messages[index + 1:])
+
+    return list(messages)
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """사용자 메시지를 기준으로 대화를 턴 단위로 나눈다."""
+    turns: List[List[BaseMessage]] = []
+
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+
+        turns[-1].append(message)
+
+    return turns
+
+def prune_tool_payload(message: BaseMessage) -> BaseMessage:
+    """긴 툴 결과를 참조로 바꾼다. tool_call_id 는 유지해 툴 호출과의 짝이 깨지지 않게 한다."""
+    if not isinstance(message, ToolMessage):
+        return message
+
+    text = _text(message)
+
+    if len(text) <= CONTEXT_TOOL_PAYLOAD_LIMIT:
+        return message
+
+    return message.model_copy(update={
+        "content": f"[{message.name or 'tool'} 결과 {len(text)}자 생략. 필요하면 툴을 다시 호출할 것]",
+        "artifact": None,
+    })
+
+def prune_structured_output(message: BaseMessage) -> BaseMessage:
+    """상태 채널에 저장된 구조화 출력 메시지는 원문 대신 참조만 남긴다."""
+    if not isinstance(message, AIMessage) or STRUCTURED_OUTPUT_KEY not in message.response_metadata:
+        return message
+
+    channels = ", ".join(message.response_metadata[STRUCTURED_OUTPUT_KEY])
+
+    return message.model_copy(update={
+        "content": f"[{channels} 결과는 '현재 작업 중인 데이터' 에 정리됨]",
+    })
+
+def build_view(state: Dict[str, Any], role: str) -> List[BaseMessage]:
+    """
+        역할에 맞게 줄인 메시지 목록을 만든다.
+        롤링 요약 + 아직 요약되지 않은 최근 턴, 그리고 긴 툴 결과는 참조로 바꾼다.
+    """
+    options = ROLE_VIEWS.get(role, DEFAULT_VIEW)
+    turns = split_turns(_unsummarized(state))
+    view: List[BaseMessage] = []
+
+    for index, turn in enumerate(turns):
+        is_current = index == len(turns) - 1
+
+        if is_current and options["current_tool_payloads"]:
+            view.extend(turn)
+        elif is_current:
+            view.extend(prune_tool_payload(message) for message in turn)
+        else:
+            view.extend(prune_structured_output(prune_tool_payload(message)) for message in turn)
+
+    # 자주 바뀌는 백로그/스프린트 요약은 맨 뒤에 두어 앞쪽 프롬프트(시스템 프롬프트, 요약, 지난 턴)가
+    # 호출마다 바이트 단위로 같게 유지되도록 한다. (프롬프트 캐시)
+    structured = summarize_structured(state)
+
+    if structured:
+        view.append(SystemMessage(content=structured))
+
+    summary = state.get("context_summary")
+
+    if summary:
+        view.insert(0, SystemMessage(content=f"## 이전 대화 요약\n{summary}"))
+
+    return view
+
+def _render(messages: List[BaseMessage]) -> str:
+    lines = []
+
+    for message in messages:
+        message = prune_structured_output(prune_tool_payload(message))
+        text = _text(message)
+        calls = getattr(message, "tool_calls", None)
+
+        if calls:
+            text += " " + ", ".join(f"{call['name']}({call['args']})" for call in calls)
+
+        lines.append(f"{message.type}: {text}")
+
+    return "\n".join(lines)
+
+async def context_manager_node(state: Dict[str, Any], config: RunnableConfig, llm: Any, prompt: str) -> Dict[str, Any]:
+    """
+        최근 CONTEXT_KEEP_TURNS 턴을 제외한 오래된 턴이 CONTEXT_SUMMARY_BATCH 이상 쌓이면
+        롤링 요약에 합친다. 메시지 자체는 지우지 않으므로 대화 기록은 그대로 남는다.
+    """
+    if CONTEXT_KEEP_TURNS <= 0:
+        return {}
+
+    turns = split_turns(_unsummarized(state))
+    folded = turns[:-CONTEXT_KEEP_TURNS]
+
+    if len(folded) < CONTEXT_SUMMARY_BATCH:
+        return {}
+
+    folded_messages = [message for turn in folded for message in turn]
+
+    try:
+        response = await llm.ainvoke(
+            [
+                SystemMessage(content=prompt),
+                HumanMessage(content=(
+                    f"기존 요약:\n{state.get('context_summary') or '(없음)'}\n\n"
+                    f"새 대화:\n{_render(folded_messages)}"
+                )),
+            ],
+            {**config, "tags": [*config.get("tags", []), TAG_NOSTREAM, TAG_HIDDEN]},
+        )
+    except Exception as e:
+        # 요약에 실패하면 요약하지 않은 턴을 그대로 넘기므로 정보는 잃지 않는다.
+        print(f"⚠️  Warning: Context summarisation failed: {e}")
+
+        return {}
+
+    return {
+        "context_summary": _text(response),
+        "context_summary_until": folded_messages[-1].id,
+    }
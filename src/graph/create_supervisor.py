@@ -1,11 +1,12 @@
 from typing import Any, Dict, List, Literal, Optional
-from pydantic import BaseModel
-from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from dotenv import load_dotenv
 
+from llm import get_chat_model
+
 load_dotenv()
 
 async def create_team_supervisor(
@@ -20,17 +21,21 @@ async def create_team_supervisor(
   class RouteResponse(BaseModel):
     reason: str
     next: Literal[*options_for_next]
+    project_ids: List[str] = Field(
+      description="Project IDs to look up in parallel. Fill only when next is ProjectFanOut, otherwise an empty list."
+    )
 
+  # 프롬프트 캐시가 맞도록 고정된 지시문은 모두 대화 기록 앞의 system 메시지 하나에 둔다.
   prompt = ChatPromptTemplate.from_messages(
     [
-      ("system", system_prompt),
-      MessagesPlaceholder(variable_name="messages"),
       (
         "system",
-        "Given the conversation above, who should act next? "
+        system_prompt + "\n\n"
+        "Given the conversation below, who should act next? "
         "If any agent want more information from the user, FINISH and ask to human to provide more information with reason"
         "Or should we FINISH? Select one of: {options}."
       ),
+      MessagesPlaceholder(variable_name="messages"),
     ]
   ).partial(options=str(options_for_next))
 
@@ -45,16 +50,9 @@ async def create_team_supervisor(
 
     print(f"Successfully loaded {len(mcp_tools)} MCP tools")
     
-    _tools.extend(mcp_tools)
+    _tools.extend(sorted(mcp_tools, key=lambda tool: tool.name))
 
-  # 타임아웃 및 재시도 설정 추가
-  llm = ChatOpenAI(
-    model=model_name, 
-    use_responses_api=True,
-    timeout=120,
-    max_retries=3,
-    request_timeout=120,
-  )
+  llm = get_chat_model(model_name, use_responses_api=True)
   
   if _tools:
     llm = llm.bind_tools(_tools)
@@ -0,0 +1,86 @@
+import os
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import AIMessage
+
+from metrics import counter
+
+from .router import _current_turn
+from .structured_state import summarize_structured
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 사용자 요청 하나에서 Supervisor 가 워커로 보낼 수 있는 최대 횟수
+LOOP_GUARD_MAX_HOPS = int(os.getenv("LOOP_GUARD_MAX_HOPS", "8"))
+# 요청 하나에서 같은 워커를 다시 고를 수 있는 최대 횟수. 넘으면 반복으로 보고 종료한다.
+LOOP_GUARD_MAX_VISITS = int(os.getenv("LOOP_GUARD_MAX_VISITS", "3"))
+# 실행 하나의 제한 시간(초). 0 이면 제한하지 않는다.
+LOOP_GUARD_DEADLINE_SECONDS = float(os.getenv("LOOP_GUARD_DEADLINE_SECONDS", "120"))
+
+EARLY_TERMINATIONS = counter(
+    "zenior_early_terminations_total",
+    "Runs finished early by the supervisor loop guard.",
+)
+
+STOP_MESSAGES = {
+    "hops": "요청을 처리하는 단계가 너무 많아져 여기서 작업을 마칩니다.",
+    "repeat": "같은 작업이 반복되고 있어 여기서 작업을 마칩니다.",
+    "deadline": "처리 시간이 제한을 넘어 여기서 작업을 마칩니다.",
+}
+
+def run_deadline(seconds: float = LOOP_GUARD_DEADLINE_SECONDS) -> Optional[float]:
+    """config["configurable"]["deadline"] 에 넣을 종료 시각(epoch 초)."""
+    return time.time() + seconds if seconds > 0 else None
+
+def turn_routes(state: Dict[str, Any]) -> List[str]:
+    """현재 사용자 요청에서 Supervisor 가 지금까지 고른 워커 목록."""
+    human, _ = _current_turn(state["messages"])
+
+    if human is None or state.get("route_turn") != human.id:
+        return []
+
+    return list(state.get("routes") or [])
+
+def route_update(state: Dict[str, Any], routes: List[str]) -> Dict[str, Any]:
+    human, _ = _current_turn(state["messages"])
+
+    return {"routes": routes, "route_turn": human.id if human is not None else None}
+
+def check_run(state: Dict[str, Any], config: Optional[dict]) -> Optional[str]:
+    """라우팅하기 전에 제한 시간과 단계 수를 확인한다. 넘었으면 사유를 반환한다."""
+    configurable = (config or {}).get("configurable", {})
+    deadline = configurable.get("deadline")
+    max_hops = configurable.get("max_hops", LOOP_GUARD_MAX_HOPS)
+
+    if deadline is not None and time.time() >= deadline:
+        return "deadline"
+
+    if max_hops > 0 and len(turn_routes(state)) >= max_hops:
+        return "hops"
+
+    return None
+
+def check_route(routes: List[str], next_node: str) -> Optional[str]:
+    """이번 요청에서 이미 여러 번 고른 워커를 다시 고르면 반복으로 본다."""
+    if LOOP_GUARD_MAX_VISITS > 0 and routes.count(next_node) >= LOOP_GUARD_MAX_VISITS:
+        return "repeat"
+
+    return None
+
+def forced_finish(state: Dict[str, Any], reason: str, routes: List[str]) -> Dict[str, Any]:
+    """지금까지 상태에 모인 결과를 부분 답변으로 남기고 종료한다."""
+    EARLY_TERMINATIONS.inc(reason=reason)
+
+    content = STOP_MESSAGES[reason]
+    summary = summarize_structured(state)
+
+    if summary:
+        content += "\n\n지금까지의 결과입니다.\n\n" + summary
+
+    return {
+        "next": "FINISH",
+        "messages": [AIMessage(content=content, name="Supervisor")],
+        **route_update(state, routes),
+    }
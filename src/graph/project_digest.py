@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import uuid
+import weakref
+from typing import Any, Dict, List, Optional
+from langchain_core.messages import HumanMessage, SystemMessage
+from langgraph.constants import TAG_HIDDEN, TAG_NOSTREAM
+from langgraph.graph.state import RunnableConfig
+from langgraph.types import Send
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 한 번의 팬아웃(한 실행)에서 동시에 조회하는 프로젝트 수. 프로젝트마다 스프린트/백로그 에이전트가 함께 실행된다.
+DIGEST_MAX_CONCURRENCY = int(os.getenv("DIGEST_MAX_CONCURRENCY", "4"))
+
+FAN_OUT = "ProjectFanOut"
+
+SPRINT_REQUEST = "프로젝트 ID {project_id} 의 진행 중/예정 스프린트 정보를 조회해줘. (goal, 기간, 남은 작업, 리스크)"
+BACKLOG_REQUEST = "프로젝트 ID {project_id} 의 미완료/우선순위 높은 백로그를 조회해서 요약해줘. (유형, 우선순위, 담당자, 블로커)"
+
+def merge_project_digests(left: Optional[Dict[str, dict]], right: Optional[Dict[str, dict]]) -> Dict[str, dict]:
+    """프로젝트 ID 를 키로 조회 결과를 합친다. None 이 들어오면 이전 결과를 비운다."""
+    if right is None:
+        return {}
+
+    return {**(left or {}), **right}
+
+# 팬아웃 묶음 ID -> 그 묶음의 조회들이 나눠 쓰는 세마포어.
+# 그래프는 프로세스 전체가 공유하므로 세마포어를 실행마다 따로 두어 다른 사용자의 조회를 막지 않게 한다.
+# 묶음의 조회가 모두 끝나 참조가 없어지면 항목도 사라진다.
+_batch_limits: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+
+def fan_out_projects(state: Dict[str, Any]) -> List[Send]:
+    batch = uuid.uuid4().hex
+
+    return [
+        Send("ProjectDigest", {"project_id": project_id, "digest_batch": batch})
+        for project_id in state.get("digest_project_ids") or []
+    ]
+
+def _batch_semaphore(batch: str) -> asyncio.Semaphore:
+    semaphore = _batch_limits.get(batch)
+
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(DIGEST_MAX_CONCURRENCY)
+        _batch_limits[batch] = semaphore
+
+    return semaphore
+
+async def _ask_agent(agent: Any, request: str, config: RunnableConfig) -> str:
+    try:
+        result = await agent.ainvoke(
+            {"messages": [HumanMessage(content=request)]},
+            # 여러 프로젝트의 토큰과 중간 메시지가 섞여 스트리밍되지 않도록 조회 단계의 출력은 보내지 않는다.
+            {**config, "tags": [*config.get("tags", []), TAG_NOSTREAM, TAG_HIDDEN]},
+        )
+    except Exception as e:
+        print(f"⚠️  Warning: Project digest lookup failed: {e}")
+
+        return f"조회 실패: {e}"
+
+    structured = result.get("structured_response")
+
+    if isinstance(structured, dict):
+        return json.dumps(structured, ensure_ascii=False)
+
+    return result["messages"][-1].text
+
+async def project_digest_node(
+    state: Dict[str, Any],
+    config: RunnableConfig,
+    agents: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+        Send 로 전달받은 프로젝트 하나의 스프린트/백로그를 동시에 조회한다.
+        같은 팬아웃 묶음의 조회끼리만 DIGEST_MAX_CONCURRENCY 를 나눠 쓴다.
+    """
+    project_id = state["project_id"]
+    semaphore = _batch_semaphore(state.get("digest_batch") or project_id)
+
+    async with semaphore:
+        sprint, backlog = await asyncio.gather(
+            _ask_agent(agents["SprintAgent"], SPRINT_REQUEST.format(project_id=project_id), config),
+            _ask_agent(agents["BacklogAgent"], BACKLOG_REQUEST.format(project_id=project_id), config),
+        )
+
+    return {
+        "project_digests": {
+            project_id: {"sprints": sprint, "backlogs": backlog}
+        }
+    }
+
+def _format_digests(digests: Dict[str, dict]) -> str:
+    sections = [
+        f"## 프로젝트 {project_id}\n"
+        f"### 스프린트\n{digest['sprints']}\n"
+        f"### 백로그\n{digest['backlogs']}"
+        for project_id, digest in digests.items()
+    ]
+
+    return "\n\n".join(sections)
+
+async def digest_summarizer_node(state: Dict[str, Any], llm: Any, prompt: str) -> Dict[str, Any]:
+    """모든 프로젝트의 조회 결과를 한 번의 LLM 호출로 요약한다."""
+    request = next(
+        (message.text for message in reversed(state["messages"]) if isinstance(message, HumanMessage)),
+        "",
+    )
+
+    response = await llm.ainvoke([
+        SystemMessage(content=prompt),
+        HumanMessage(content=f"사용자 요청: {request}\n\n{_format_digests(state['project_digests'])}"),
+    ])
+
+    response.name = "DigestSummarizer"
+
+    return {
+        "messages": [response],
+        "digest_project_ids": [],
+    }
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Optional
+from langgraph.graph.state import CompiledStateGraph, RunnableConfig
+
+from team.mcp_utils import (
+    mcp_enabled,
+    mcp_tools_fingerprint,
+    mcp_tools_fresh,
+    mcp_tools_ready,
+    setup_mcp_tools,
+)
+
+from .scrum_agent import AGENT_SETUP_TIMEOUT, create_scrum_agent_graph
+
+# 그래프 토폴로지는 사용자와 무관하므로 프로세스당 한 번만 컴파일한다.
+# 사용자 토큰은 실행 시점에 config["configurable"]["token"] (BearerToken) 으로 주입된다.
+_graph: Optional[CompiledStateGraph] = None
+_graph_fingerprint: Optional[str] = None
+_lock = asyncio.Lock()
+
+def _graph_is_current() -> bool:
+    if not mcp_enabled():
+        return True
+
+    return mcp_tools_fresh() and mcp_tools_fingerprint() == _graph_fingerprint
+
+async def get_scrum_agent_graph(config: Optional[RunnableConfig] = None) -> CompiledStateGraph:
+    """
+        컴파일된 스크럼 그래프를 반환한다. 최초 호출에서만 그래프를 만든다.
+        MCP 툴을 아직 불러오지 못한 경우에는 캐시하지 않고 다음 요청에서 다시 시도한다.
+        툴 스키마 캐시가 만료되면 다시 조회하고, 스키마가 바뀐 경우에만 다시 컴파일한다.
+    """
+    global _graph, _graph_fingerprint
+
+    if _graph is not None and _graph_is_current():
+        return _graph
+
+    async with _lock:
+        if mcp_enabled() and not mcp_tools_fresh():
+            try:
+                await asyncio.wait_for(setup_mcp_tools(config), timeout=AGENT_SETUP_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+
+        fingerprint = mcp_tools_fingerprint()
+
+        if _graph is not None and fingerprint == _graph_fingerprint:
+            return _graph
+
+        graph = await create_scrum_agent_graph(config)
+
+        # 툴 조회가 늦어 일부 에이전트가 MCP 툴 없이 만들어졌다면
+        # 지문이 달라지므로 다음 요청에서 다시 컴파일된다.
+        if mcp_tools_ready():
+            _graph = graph
+            _graph_fingerprint = fingerprint
+
+        return graph
+
+def reset_scrum_agent_graph():
+    global _graph, _graph_fingerprint
+    _graph = None
+    _graph_fingerprint = None
@@ -0,0 +1,509 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 스레드(namespace)마다 남겨둘 최신 체크포인트 개수
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+# 마지막 체크포인트 이후 이 시간(초)이 지나면 스레드 전체를 삭제한다. 0 이면 삭제하지 않는다.
+CHECKPOINT_THREAD_TTL = float(os.getenv("CHECKPOINT_THREAD_TTL", str(7 * 24 * 3600)))
+# 백그라운드 압축 주기(초)
+CHECKPOINT_COMPACTION_INTERVAL = float(os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "300"))
+
+# uuid6 타임스탬프 기준점(1582-10-15)과 유닉스 epoch 사이의 100ns 단위 차이
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+# 레플리카 간 Postgres 압축을 직렬화하는 advisory lock 키
+_POSTGRES_COMPACTION_LOCK = 0x5A454E494F52
+
+def checkpoint_time(checkpoint_id: str) -> Optional[float]:
+    """체크포인트 ID(uuid6)에 들어있는 생성 시각을 유닉스 시간으로 반환한다."""
+    try:
+        value = uuid.UUID(checkpoint_id)
+    except (TypeError, ValueError):
+        return None
+
+    if value.version != 6:
+        return None
+
+    timestamp = (value.time_low << 28) | (value.time_mid << 12) | (value.time_hi_version & 0x0FFF)
+
+    return (timestamp - _UUID_EPOCH_OFFSET) / 1e7
+
+def _new_stats() -> Dict[str, int]:
+    return {
+        "threads_expired": 0,
+        "namespaces_pruned": 0,
+        "checkpoints_pruned": 0,
+        "writes_pruned": 0,
+        "bytes_reclaimed": 0,
+    }
+
+def _is_expired(latest_checkpoint_id: str, now: float) -> bool:
+    if CHECKPOINT_THREAD_TTL <= 0:
+        return False
+
+    created_at = checkpoint_time(latest_checkpoint_id)
+
+    return created_at is not None and now - created_at > CHECKPOINT_THREAD_TTL
+
+def _typed_size(value: Any) -> int:
+    # MemorySaver 는 (type, bytes) 형태로 직렬화된 값을 저장한다.
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], (bytes, bytearray)):
+        return len(value[1])
+
+    return 0
+
+def _finished_namespaces(latest_by_ns: Dict[str, str]) -> List[str]:
+    """
+        워커 서브그래프는 호출마다 새 namespace(BacklogAgent:<task_id> 등)에 체크포인트를 남긴다.
+        최상위("") 의 최신 체크포인트보다 먼저 끝난 namespace 는 이미 끝난 단계의 것이라 다시 읽히지 않는다.
+        실행 중이거나 interrupt 로 멈춘 서브그래프는 최상위 최신 체크포인트 이후에 기록되므로 남는다.
+    """
+    root_latest = latest_by_ns.get("")
+
+    if root_latest is None:
+        return []
+
+    return [
+        checkpoint_ns for checkpoint_ns, latest in latest_by_ns.items()
+        if checkpoint_ns and latest < root_latest
+    ]
+
+def _compact_memory(saver: MemorySaver, now: float) -> Dict[str, int]:
+    stats = _new_stats()
+
+    for thread_id in list(saver.storage.keys()):
+        namespaces = saver.storage[thread_id]
+        latest = max(
+            (checkpoint_id for checkpoints in namespaces.values() for checkpoint_id in checkpoints),
+            default=None,
+        )
+
+        if latest is None or _is_expired(latest, now):
+            for checkpoints in namespaces.values():
+                for checkpoint, metadata, _ in checkpoints.values():
+                    stats["bytes_reclaimed"] += _typed_size(checkpoint) + _typed_size(metadata)
+                stats["checkpoints_pruned"] += len(checkpoints)
+
+            for key in [key for key in saver.writes if key[0] == thread_id]:
+                for _, _, value, *_ in saver.writes[key].values():
+                    stats["bytes_reclaimed"] += _typed_size(value)
+                stats["writes_pruned"] += len(saver.writes[key])
+                del saver.writes[key]
+
+            for key in [key for key in saver.blobs if key[0] == thread_id]:
+                stats["bytes_reclaimed"] += _typed_size(saver.blobs[key])
+                del saver.blobs[key]
+
+            del saver.storage[thread_id]
+            stats["threads_expired"] += 1
+
+            continue
+
+        for checkpoint_ns in _finished_namespaces({
+            checkpoint_ns: max(checkpoints) for checkpoint_ns, checkpoints in namespaces.items() if checkpoints
+        }):
+            for checkpoint, metadata, _ in namespaces.pop(checkpoint_ns).values():
+                stats["bytes_reclaimed"] += _typed_size(checkpoint) + _typed_size(metadata)
+                stats["checkpoints_pruned"] += 1
+
+            for key in [key for key in saver.writes if key[:2] == (thread_id, checkpoint_ns)]:
+                for _, _, value, *_ in saver.writes[key].values():
+                    stats["bytes_reclaimed"] += _typed_size(value)
+                stats["writes_pruned"] += len(saver.writes[key])
+                del saver.writes[key]
+
+            for key in [key for key in saver.blobs if key[:2] == (thread_id, checkpoint_ns)]:
+                stats["bytes_reclaimed"] += _typed_size(saver.blobs[key])
+                del saver.blobs[key]
+
+            stats["namespaces_pruned"] += 1
+
+        for checkpoint_ns, checkpoints in namespaces.items():
+            ordered = sorted(checkpoints.keys(), reverse=True)
+            kept, pruned = ordered[:CHECKPOINT_KEEP_LAST], ordered[CHECKPOINT_KEEP_LAST:]
+
+            if not pruned:
+                continue
+
+            for checkpoint_id in pruned:
+                checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+                stats["bytes_reclaimed"] += _typed_size(checkpoint) + _typed_size(metadata)
+                stats["checkpoints_pruned"] += 1
+
+                writes = saver.writes.pop((thread_id, checkpoint_ns, checkpoint_id), {})
+                for _, _, value, *_ in writes.values():
+                    stats["bytes_reclaimed"] += _typed_size(value)
+                stats["writes_pruned"] += len(writes)
+
+            # 남은 체크포인트가 참조하지 않는 채널 값(blob)은 더 이상 읽히지 않는다.
+            referenced = set()
+            for checkpoint_id in kept:
+                checkpoint = saver.serde.loads_typed(checkpoints[checkpoint_id][0])
+                referenced.update(checkpoint["channel_versions"].items())
+
+            for key in [
+                key for key in saver.blobs
+                if key[0] == thread_id and key[1] == checkpoint_ns and (key[2], key[3]) not in referenced
+            ]:
+                stats["bytes_reclaimed"] += _typed_size(saver.blobs[key])
+                del saver.blobs[key]
+
+    return stats
+
+async def _compact_sqlite(saver: Any, now: float) -> Dict[str, int]:
+    stats = _new_stats()
+    conn = saver.conn
+
+    async with saver.lock:
+        async with conn.execute(
+            "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+        ) as cursor:
+            threads = await cursor.fetchall()
+
+        for thread_id, latest in threads:
+            if _is_expired(latest, now):
+                async with conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+                    "FROM checkpoints WHERE thread_id = ?",
+                    (thread_id,),
+                ) as cursor:
+                    count, size = await cursor.fetchone()
+                async with conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?",
+                    (thread_id,),
+                ) as cursor:
+                    writes_count, writes_size = await cursor.fetchone()
+
+                await conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                await conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+                stats["threads_expired"] += 1
+                stats["checkpoints_pruned"] += count
+                stats["writes_pruned"] += writes_count
+                stats["bytes_reclaimed"] += size + writes_size
+
+                continue
+
+            async with conn.execute(
+                "SELECT checkpoint_ns, MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? GROUP BY checkpoint_ns",
+                (thread_id,),
+            ) as cursor:
+                finished = _finished_namespaces(dict(await cursor.fetchall()))
+
+            if finished:
+                placeholders = ", ".join("?" * len(finished))
+                in_finished = f"thread_id = ? AND checkpoint_ns IN ({placeholders})"
+
+                async with conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+                    f"FROM checkpoints WHERE {in_finished}",
+                    (thread_id, *finished),
+                ) as cursor:
+                    count, size = await cursor.fetchone()
+                async with conn.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE {in_finished}",
+                    (thread_id, *finished),
+                ) as cursor:
+                    writes_count, writes_size = await cursor.fetchone()
+
+                await conn.execute(f"DELETE FROM checkpoints WHERE {in_finished}", (thread_id, *finished))
+                await conn.execute(f"DELETE FROM writes WHERE {in_finished}", (thread_id, *finished))
+
+                stats["namespaces_pruned"] += len(finished)
+                stats["checkpoints_pruned"] += count
+                stats["writes_pruned"] += writes_count
+                stats["bytes_reclaimed"] += size + writes_size
+
+            stale = """
+                thread_id = ? AND checkpoint_id NOT IN (
+                    SELECT checkpoint_id FROM checkpoints AS latest
+                    WHERE latest.thread_id = checkpoints.thread_id
+                      AND latest.checkpoint_ns = checkpoints.checkpoint_ns
+                    ORDER BY checkpoint_id DESC LIMIT ?
+                )
+            """
+            async with conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+                f"FROM checkpoints WHERE {stale}",
+                (thread_id, CHECKPOINT_KEEP_LAST),
+            ) as cursor:
+                count, size = await cursor.fetchone()
+
+            if not count:
+                continue
+
+            await conn.execute(
+                f"DELETE FROM checkpoints WHERE {stale}",
+                (thread_id, CHECKPOINT_KEEP_LAST),
+            )
+
+            orphan_writes = """
+                thread_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints
+                    WHERE checkpoints.thread_id = writes.thread_id
+                      AND checkpoints.checkpoint_ns = writes.checkpoint_ns
+                      AND checkpoints.checkpoint_id = writes.checkpoint_id
+                )
+            """
+            async with conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE {orphan_writes}",
+                (thread_id,),
+            ) as cursor:
+                writes_count, writes_size = await cursor.fetchone()
+
+            await conn.execute(f"DELETE FROM writes WHERE {orphan_writes}", (thread_id,))
+
+            stats["checkpoints_pruned"] += count
+            stats["writes_pruned"] += writes_count
+            stats["bytes_reclaimed"] += size + writes_size
+
+        await conn.commit()
+
+    return stats
+
+async def _compact_postgres(saver: Any, now: float) -> Dict[str, int]:
+    from langgraph.checkpoint.postgres import _ainternal
+
+    stats = _new_stats()
+
+    # saver.lock 으로 같은 프로세스의 aput 과 커넥션을 나눠 쓰지 않게 하고,
+    # advisory lock 으로 여러 레플리카 중 한 곳만 압축하게 한다.
+    async with saver.lock, _ainternal.get_connection(saver.conn) as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT pg_try_advisory_lock(%s) AS locked", (_POSTGRES_COMPACTION_LOCK,))
+
+            if not (await cur.fetchone())["locked"]:
+                return stats
+
+            try:
+                await _compact_postgres_threads(cur, now, stats)
+            finally:
+                await cur.execute("SELECT pg_advisory_unlock(%s)", (_POSTGRES_COMPACTION_LOCK,))
+
+    return stats
+
+async def _compact_postgres_threads(cur: Any, now: float, stats: Dict[str, int]):
+    await cur.execute(
+        "SELECT thread_id, MAX(checkpoint_id) AS latest FROM checkpoints GROUP BY thread_id"
+    )
+    threads = await cur.fetchall()
+
+    for row in threads:
+        thread_id = row["thread_id"]
+
+        if _is_expired(row["latest"], now):
+            # 조회 이후 다른 레플리카가 새 체크포인트를 쓰기 시작했을 수 있으므로
+            # 조회한 시점까지의 체크포인트만 지우고, 남은 체크포인트가 없을 때만 blob 을 지운다.
+            await cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = %s AND checkpoint_id <= %s "
+                "RETURNING octet_length(checkpoint::text) + octet_length(metadata::text) AS size",
+                (thread_id, row["latest"]),
+            )
+            checkpoints = await cur.fetchall()
+            await cur.execute(
+                "DELETE FROM checkpoint_writes WHERE thread_id = %s AND checkpoint_id <= %s "
+                "RETURNING octet_length(blob) AS size",
+                (thread_id, row["latest"]),
+            )
+            writes = await cur.fetchall()
+            await cur.execute(
+                """
+                DELETE FROM checkpoint_blobs AS b WHERE b.thread_id = %s
+                  AND NOT EXISTS (SELECT 1 FROM checkpoints AS c WHERE c.thread_id = b.thread_id)
+                RETURNING COALESCE(octet_length(b.blob), 0) AS size
+                """,
+                (thread_id,),
+            )
+            blobs = await cur.fetchall()
+
+            stats["threads_expired"] += 1
+            stats["checkpoints_pruned"] += len(checkpoints)
+            stats["writes_pruned"] += len(writes)
+            stats["bytes_reclaimed"] += sum(r["size"] for r in [*checkpoints, *blobs, *writes])
+
+            continue
+
+        await cur.execute(
+            "SELECT checkpoint_ns, MAX(checkpoint_id) AS latest FROM checkpoints "
+            "WHERE thread_id = %s GROUP BY checkpoint_ns",
+            (thread_id,),
+        )
+        finished = _finished_namespaces({r["checkpoint_ns"]: r["latest"] for r in await cur.fetchall()})
+
+        if finished:
+            # 끝난 서브그래프의 namespace 에는 더 이상 aput 이 오지 않으므로 blob 까지 통째로 지운다.
+            await cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = %s AND checkpoint_ns = ANY(%s) "
+                "RETURNING octet_length(checkpoint::text) + octet_length(metadata::text) AS size",
+                (thread_id, finished),
+            )
+            checkpoints = await cur.fetchall()
+            await cur.execute(
+                "DELETE FROM checkpoint_writes WHERE thread_id = %s AND checkpoint_ns = ANY(%s) "
+                "RETURNING octet_length(blob) AS size",
+                (thread_id, finished),
+            )
+            writes = await cur.fetchall()
+            await cur.execute(
+                "DELETE FROM checkpoint_blobs WHERE thread_id = %s AND checkpoint_ns = ANY(%s) "
+                "RETURNING COALESCE(octet_length(blob), 0) AS size",
+                (thread_id, finished),
+            )
+            blobs = await cur.fetchall()
+
+            stats["namespaces_pruned"] += len(finished)
+            stats["checkpoints_pruned"] += len(checkpoints)
+            stats["writes_pruned"] += len(writes)
+            stats["bytes_reclaimed"] += sum(r["size"] for r in [*checkpoints, *blobs, *writes])
+
+        await cur.execute(
+            """
+            DELETE FROM checkpoints AS c WHERE c.thread_id = %s AND c.checkpoint_id NOT IN (
+                SELECT latest.checkpoint_id FROM checkpoints AS latest
+                WHERE latest.thread_id = c.thread_id AND latest.checkpoint_ns = c.checkpoint_ns
+                ORDER BY latest.checkpoint_id DESC LIMIT %s
+            )
+            RETURNING c.checkpoint_ns, c.checkpoint_id, c.checkpoint -> 'channel_versions' AS versions,
+                octet_length(c.checkpoint::text) + octet_length(c.metadata::text) AS size
+            """,
+            (thread_id, CHECKPOINT_KEEP_LAST),
+        )
+        checkpoints = await cur.fetchall()
+
+        if not checkpoints:
+            continue
+
+        await cur.execute(
+            """
+            DELETE FROM checkpoint_writes AS w WHERE w.thread_id = %s
+              AND (w.checkpoint_ns, w.checkpoint_id) IN (SELECT * FROM unnest(%s::text[], %s::text[]))
+            RETURNING octet_length(w.blob) AS size
+            """,
+            (
+                thread_id,
+                [r["checkpoint_ns"] for r in checkpoints],
+                [r["checkpoint_id"] for r in checkpoints],
+            ),
+        )
+        writes = await cur.fetchall()
+
+        # aput 은 체크포인트 행보다 blob 을 먼저 쓰므로, 참조하는 체크포인트가 없는 blob 을 모두 지우면
+        # 아직 쓰이는 중인 최신 체크포인트의 blob 까지 지울 수 있다.
+        # 이번에 지운 체크포인트가 참조하던 blob 중 남은 체크포인트가 참조하지 않는 것만 지운다.
+        referenced = {
+            (r["checkpoint_ns"], channel, str(version))
+            for r in checkpoints
+            for channel, version in (r["versions"] or {}).items()
+        }
+        blobs = []
+
+        if referenced:
+            namespaces, channels, versions = (list(column) for column in zip(*referenced))
+            await cur.execute(
+                """
+                DELETE FROM checkpoint_blobs AS b WHERE b.thread_id = %s
+                  AND (b.checkpoint_ns, b.channel, b.version)
+                      IN (SELECT * FROM unnest(%s::text[], %s::text[], %s::text[]))
+                  AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints AS c
+                    WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+                      AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+                  )
+                RETURNING COALESCE(octet_length(b.blob), 0) AS size
+                """,
+                (thread_id, namespaces, channels, versions),
+            )
+            blobs = await cur.fetchall()
+
+        stats["checkpoints_pruned"] += len(checkpoints)
+        stats["writes_pruned"] += len(writes)
+        stats["bytes_reclaimed"] += sum(r["size"] for r in [*checkpoints, *blobs, *writes])
+
+class CheckpointRetention:
+    """
+        체크포인트 보존 정책.
+        끝난 워커 서브그래프의 namespace 는 지우고, 남은 namespace 마다 최신 CHECKPOINT_KEEP_LAST 개만 남긴다.
+        CHECKPOINT_THREAD_TTL 동안 활동이 없는 스레드는 통째로 지운다.
+    """
+    def __init__(self, checkpointer: BaseCheckpointSaver):
+        self.checkpointer = checkpointer
+        self.totals = _new_stats()
+        self.runs = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def compact(self) -> Dict[str, int]:
+        now = time.time()
+        backend = type(self.checkpointer).__name__
+
+        if isinstance(self.checkpointer, MemorySaver):
+            stats = _compact_memory(self.checkpointer, now)
+        elif backend == "AsyncSqliteSaver":
+            stats = await _compact_sqlite(self.checkpointer, now)
+        elif backend == "AsyncPostgresSaver":
+            stats = await _compact_postgres(self.checkpointer, now)
+        else:
+            # Redis 는 키 TTL 로 만료를 처리하므로 여기서는 할 일이 없다.
+            return _new_stats()
+
+        self.runs += 1
+        for key, value in stats.items():
+            self.totals[key] += value
+
+        if stats["checkpoints_pruned"] or stats["threads_expired"]:
+            print(
+                f"✓ Checkpoint compaction reclaimed {stats['bytes_reclaimed']} bytes "
+                f"({stats['checkpoints_pruned']} checkpoints, {stats['writes_pruned']} writes, "
+                f"{stats['namespaces_pruned']} finished subgraph namespaces, "
+                f"{stats['threads_expired']} expired threads)"
+            )
+
+        return stats
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(CHECKPOINT_COMPACTION_INTERVAL)
+
+            try:
+                await self.compact()
+            except Exception as e:
+                print(f"⚠️  Warning: Checkpoint compaction failed: {e}")
+
+    def start(self):
+        if self._task is None and CHECKPOINT_COMPACTION_INTERVAL > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+_retention: Optional[CheckpointRetention] = None
+
+def start_checkpoint_compaction(checkpointer: BaseCheckpointSaver) -> CheckpointRetention:
+    global _retention
+
+    if _retention is None:
+        _retention = CheckpointRetention(checkpointer)
+        _retention.start()
+
+    return _retention
+
+async def stop_checkpoint_compaction():
+    global _retention
+
+    if _retention is not None:
+        await _retention.stop()
+        _retention = None
+
+def get_checkpoint_retention() -> Optional[CheckpointRetention]:
+    return _retention
@@ -0,0 +1,138 @@
+import os
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from team.mcp_utils import is_mutating_tool
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 사용할 규칙 이름 목록(쉼표 구분). 비워두면 항상 LLM Supervisor 가 결정한다.
+SUPERVISOR_FAST_PATH_RULES = os.getenv(
+    "SUPERVISOR_FAST_PATH_RULES",
+    "selection_followup,direct_lookup_finish",
+)
+
+SELECTION_TOOLS = ("request_project_selection", "request_workspace_selection")
+
+BACKLOG_KEYWORDS = ("백로그", "backlog")
+SPRINT_KEYWORDS = ("스프린트", "sprint")
+LOOKUP_KEYWORDS = ("조회", "보여", "알려", "목록", "상태")
+# 여러 단계가 필요하거나 요약/변경이 들어간 요청은 LLM 에게 맡긴다.
+MULTI_STEP_KEYWORDS = ("생성", "만들", "수정", "저장", "삭제", "추가", "요약", "오늘", "모든", "전체")
+
+RouteRule = Callable[[Dict[str, Any]], Optional[str]]
+
+router_stats: Counter = Counter()
+
+def _current_turn(messages: List[BaseMessage]) -> tuple[Optional[HumanMessage], List[BaseMessage]]:
+    """마지막 사용자 메시지와 그 이후의 메시지들을 반환한다."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index], messages[index + 1:]
+
+    return None, list(messages)
+
+def _text(message: BaseMessage) -> str:
+    return message.text if isinstance(message.text, str) else message.text()
+
+def _worker_answered(turn: List[BaseMessage]) -> bool:
+    return bool(turn) and isinstance(turn[-1], AIMessage) and not turn[-1].tool_calls
+
+def _tool_calls(turn: List[BaseMessage]) -> List[dict]:
+    return [call for message in turn if isinstance(message, AIMessage) for call in message.tool_calls]
+
+def selection_followup(state: Dict[str, Any]) -> Optional[str]:
+    """
+        ProjectAgent 가 request_project_selection 으로 프로젝트 ID 를 받아 턴을 끝냈다면
+        원래 요청이 가리키는 에이전트(백로그/스프린트)로 바로 보낸다.
+    """
+    human, turn = _current_turn(state["messages"])
+
+    if human is None or not _worker_answered(turn):
+        return None
+
+    calls = _tool_calls(turn)
+
+    if not calls or calls[-1]["name"] != "request_project_selection":
+        return None
+
+    answered = {message.tool_call_id for message in turn if isinstance(message, ToolMessage)}
+    if calls[-1]["id"] not in answered:
+        return None
+
+    request = _text(human).lower()
+    wants_backlog = any(keyword in request for keyword in BACKLOG_KEYWORDS)
+    wants_sprint = any(keyword in request for keyword in SPRINT_KEYWORDS)
+
+    if wants_backlog and not wants_sprint:
+        return "BacklogAgent"
+    if wants_sprint and not wants_backlog:
+        return "SprintAgent"
+
+    return None
+
+def direct_lookup_finish(state: Dict[str, Any]) -> Optional[str]:
+    """
+        단순 조회 요청에 워커 하나가 읽기 툴만 써서 답했다면 바로 FINISH 한다.
+    """
+    human, turn = _current_turn(state["messages"])
+
+    if human is None or not _worker_answered(turn):
+        return None
+
+    request = _text(human).lower()
+
+    if not any(keyword in request for keyword in LOOKUP_KEYWORDS):
+        return None
+    if any(keyword in request for keyword in MULTI_STEP_KEYWORDS):
+        return None
+
+    # 이번 턴에 답변을 마친 워커가 하나뿐이어야 한다.
+    answers = [message for message in turn if isinstance(message, AIMessage) and not message.tool_calls]
+    if len(answers) != 1:
+        return None
+
+    calls = _tool_calls(turn)
+    if not calls:
+        return None
+    if any(call["name"] in SELECTION_TOOLS or is_mutating_tool(call["name"]) for call in calls):
+        return None
+
+    # 워커가 사용자에게 되묻는 경우에는 LLM 이 판단하게 한다.
+    if _text(answers[0]).rstrip().endswith("?"):
+        return None
+
+    return "FINISH"
+
+RULES: Dict[str, RouteRule] = {
+    "selection_followup": selection_followup,
+    "direct_lookup_finish": direct_lookup_finish,
+}
+
+def enabled_rules() -> List[RouteRule]:
+    names = [name.strip() for name in SUPERVISOR_FAST_PATH_RULES.split(",") if name.strip()]
+
+    return [RULES[name] for name in names if name in RULES]
+
+def pre_route(state: Dict[str, Any]) -> Optional[str]:
+    """
+        상태만 보고 다음 노드가 분명한 경우 그 이름을 반환한다.
+        확신할 수 없으면 None 을 반환해 LLM Supervisor 에게 맡긴다.
+    """
+    for rule in enabled_rules():
+        decision = rule(state)
+
+        if decision is not None:
+            router_stats[rule.__name__] += 1
+
+            return decision
+
+    router_stats["llm"] += 1
+
+    return None
+
+def get_router_stats() -> Dict[str, int]:
+    return dict(router_stats)
@@ -1,3 +1,5 @@
+import asyncio
+import os
 from functools import partial
 from typing import List, TypedDict, Annotated, Optional
 import operator
@@ -8,33 +10,71 @@ from langgraph.graph.state import RunnableConfig
 
 from dotenv import load_dotenv
 
+from llm import MODEL_NAME, get_chat_model
+from metrics import span, thread_id_of
+from usage import BUDGET_MESSAGES, BUDGET_STOPS, usage_ledger, user_id_of
+
 from .create_supervisor import create_team_supervisor
-from .supervisor_prompt import prompt
+from .supervisor_prompt import prompt, digest_prompt, context_summary_prompt
+from .checkpointer import get_checkpointer
+from .router import pre_route
+from .loop_guard import check_route, check_run, forced_finish, route_update, turn_routes
+from .speculation import discard_pending, settle_speculation, start_speculation, take_speculation
+from .context import CONTEXT_SUMMARY_MODEL, build_view, context_manager_node
+from .structured_state import STRUCTURED_OUTPUT_KEY, structured_items, upsert_by_key, structured_update
+from .project_digest import (
+    FAN_OUT,
+    digest_summarizer_node,
+    fan_out_projects,
+    merge_project_digests,
+    project_digest_node,
+)
 
-from team.backlog import create_backlog_agent, Backlog
-from team.sprint import create_sprint_agent, Sprint
+from team.backlog import create_backlog_agent
+from team.bulk_save import STRUCTURED_CONFIG_KEY
+from team.sprint import create_sprint_agent
 from team.project import create_project_agent
 
 load_dotenv()
 
-from langgraph.checkpoint.memory import MemorySaver
-
-checkpointer = MemorySaver()
+# 에이전트별 준비(MCP 툴 조회 포함) 제한 시간(초).
+# 시간 안에 끝나지 않으면 MCP 툴 없이 에이전트를 만든다.
+AGENT_SETUP_TIMEOUT = float(os.getenv("AGENT_SETUP_TIMEOUT", "15"))
 
-MODEL_NAME = "gpt-4o"
+AGENT_FACTORIES = {
+    "BacklogAgent": create_backlog_agent,
+    "SprintAgent": create_sprint_agent,
+    "ProjectAgent": create_project_agent,
+}
 
 class ScrumState(TypedDict):
     messages: Annotated[List[BaseMessage], add_messages]
     requirements: str
 
-    backlogs: Annotated[List[Backlog], operator.add]
-    sprints: Annotated[List[Sprint], operator.add]
+    # 에이전트의 구조화된 출력을 ID(없으면 title/sprint_number)로 색인해 보관한다.
+    backlogs: Annotated[Dict[str, dict], upsert_by_key]
+    sprints: Annotated[Dict[str, dict], upsert_by_key]
     project_report: dict
 
+    # ProjectFanOut 으로 동시에 조회할 프로젝트 ID 와 프로젝트별 조회 결과
+    digest_project_ids: List[str]
+    project_digests: Annotated[Dict[str, dict], merge_project_digests]
+
+    # 오래된 턴을 접어 둔 롤링 요약과 요약에 포함된 마지막 메시지 ID
+    context_summary: str
+    context_summary_until: Optional[str]
+
+    # 현재 사용자 요청(route_turn 은 그 HumanMessage ID)에서 Supervisor 가 고른 워커들
+    routes: List[str]
+    route_turn: Optional[str]
+
     next: str
 
-def get_next_node(state: ScrumState) -> str:
+def get_next_node(state: ScrumState) -> Any:
     """Get the next node from supervisor's decision."""
+    if state["next"] == FAN_OUT:
+        return fan_out_projects(state)
+
     return state["next"]
 
 def check_worker_handoff(state: ScrumState) -> Literal[END, "done"]:
@@ -55,58 +95,186 @@ def check_worker_handoff(state: ScrumState) -> Literal[END, "done"]:
         
     return "done"
 
-async def run_agent_node(state: ScrumState, agent: Any, name: str) -> Dict[str, Any]:
-    original_count = len(state["messages"])
+async def run_agent_node(state: ScrumState, config: RunnableConfig, agent: Any, name: str) -> Dict[str, Any]:
+    view = build_view(state, name)
+    original_count = len(view)
+    # 일괄 저장 툴이 LLM 을 거치지 않고 상태의 백로그/스프린트를 읽을 수 있게 한다.
+    config = {
+        **config,
+        "configurable": {**config.get("configurable", {}), STRUCTURED_CONFIG_KEY: structured_items(state)},
+    }
     
-    result = await agent.ainvoke(state)
+    # Supervisor 가 결정하는 동안 같은 입력으로 미리 실행해 둔 결과가 있으면 그대로 쓴다.
+    speculation = take_speculation(config, name, view)
+
+    with span("worker", name=name, thread_id=thread_id_of(config)):
+        if speculation is not None:
+            result = await speculation.task
+        else:
+            result = await agent.ainvoke({"messages": view}, config)
     
     new_messages = result["messages"][original_count:]
     
     update = {"messages": new_messages}
-    
-    for key in ["backlog", "sprints", "project_report"]:
-        if key in result and result[key]:
-            update[key] = result[key]
+
+    structured = structured_update(result.get("structured_response"), state)
+
+    if structured and new_messages:
+        # 이후 턴에서는 이 메시지 대신 상태에 저장된 요약을 보여주도록 표시해 둔다.
+        final_message = new_messages[-1]
+        final_message.response_metadata = {
+            **final_message.response_metadata,
+            STRUCTURED_OUTPUT_KEY: list(structured),
+        }
+
+    update.update(structured)
+
+    if result.get("project_report"):
+        update["project_report"] = result["project_report"]
     
     return update
 
-async def create_scrum_agent_graph(config: Optional[RunnableConfig] = None):
+async def supervisor_node(state: ScrumState, config: RunnableConfig, chain: Any, agents: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        규칙으로 다음 노드가 분명하면 LLM 호출 없이 바로 결정하고,
+        그렇지 않을 때만 Supervisor 체인을 호출한다.
+        SUPERVISOR_SPECULATION 이 켜져 있으면 체인을 호출하는 동안 다음 워커를 미리 실행한다.
+        토큰 한도, 단계 수, 제한 시간을 넘거나 같은 워커를 반복해서 고르면
+        더 진행하지 않고 종료한다.
+    """
+    exceeded = usage_ledger.budget_exceeded(thread_id_of(config), user_id_of(config))
+
+    if exceeded:
+        BUDGET_STOPS.inc(scope=exceeded)
+        discard_pending(thread_id_of(config))
+
+        return {
+            "next": "FINISH",
+            "messages": [AIMessage(content=BUDGET_MESSAGES[exceeded], name="Supervisor")],
+        }
+
+    routes = turn_routes(state)
+    stopped = check_run(state, config)
+
+    if stopped:
+        discard_pending(thread_id_of(config))
+        return forced_finish(state, stopped, routes)
+
+    speculation = None
+
+    with span("supervisor", name="rules", thread_id=thread_id_of(config)) as stage:
+        next_node = pre_route(state)
+
+        if next_node is not None:
+            update = {"next": next_node}
+        else:
+            stage["name"] = "llm"
+            speculation = start_speculation(routes, state, config, agents, build_view)
 
+            try:
+                route = await chain.ainvoke({**state, "messages": build_view(state, "Supervisor")})
+            except BaseException:
+                settle_speculation(speculation, routes, "FINISH", config)
+                raise
+
+            update = route_decision(route)
+
+    if update["next"] != "FINISH":
+        repeated = check_route(routes, update["next"])
+
+        if repeated:
+            settle_speculation(speculation, routes, "FINISH", config)
+            return forced_finish(state, repeated, routes)
+
+    settle_speculation(speculation, routes, update["next"], config)
+
+    if update["next"] != "FINISH":
+        routes = [*routes, update["next"]]
+
+    return {**update, **route_update(state, routes)}
+
+def route_decision(route: Any) -> Dict[str, Any]:
+    if route.next == FAN_OUT:
+        if not route.project_ids:
+            # 프로젝트 목록이 없으면 먼저 ProjectAgent 가 조회하게 한다.
+            return {"next": "ProjectAgent"}
+
+        return {
+            "next": FAN_OUT,
+            "digest_project_ids": list(dict.fromkeys(route.project_ids)),
+            "project_digests": None,
+        }
+
+    return {"next": route.next}
+
+async def create_agent_with_fallback(name: str, factory: Any, config: Optional[RunnableConfig]):
     try:
-        backlog_agent = await create_backlog_agent(config)
-        sprint_agent = await create_sprint_agent(config)
-        project_agent = await create_project_agent(config)
+        return await asyncio.wait_for(factory(config), timeout=AGENT_SETUP_TIMEOUT)
     except Exception as e:
-        print(f"Error creating agents: {e}")
-        return None
-        
-    agents_map = {
-        "BacklogAgent": backlog_agent,
-        "SprintAgent": sprint_agent,
-        "ProjectAgent": project_agent
-    }
+        print(f"⚠️  Warning: {name} setup failed ({e!r}). Running {name} without MCP tools.")
+
+        return await factory(config, mcp_tools=[])
+
+async def create_agents(config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+    """에이전트들을 동시에 만든다. 하나가 느리거나 실패해도 나머지는 영향을 받지 않는다."""
+    agents = await asyncio.gather(*(
+        create_agent_with_fallback(name, factory, config)
+        for name, factory in AGENT_FACTORIES.items()
+    ))
+
+    return dict(zip(AGENT_FACTORIES.keys(), agents))
+
+async def create_scrum_agent_graph(config: Optional[RunnableConfig] = None):
+    with span("graph_build", thread_id=thread_id_of(config)):
+        return await _create_scrum_agent_graph(config)
+
+async def _create_scrum_agent_graph(config: Optional[RunnableConfig] = None):
+    agents_map = await create_agents(config)
     
     members = list(agents_map.keys())
 
     supervisor_agent = await create_team_supervisor(
-        "gpt-4o",
+        MODEL_NAME,
         prompt,
-        members,
+        [*members, FAN_OUT],
     )
 
+    summarizer_llm = get_chat_model(MODEL_NAME, use_responses_api=True)
+    context_llm = get_chat_model(CONTEXT_SUMMARY_MODEL)
+
     graph = StateGraph(ScrumState)
-    graph.add_node("Supervisor", supervisor_agent)
+    graph.add_node(
+        "ContextManager",
+        partial(context_manager_node, llm=context_llm, prompt=context_summary_prompt),
+    )
+    graph.add_node("Supervisor", partial(supervisor_node, chain=supervisor_agent, agents=agents_map))
+    graph.add_edge("ContextManager", "Supervisor")
     
     for name in members:
-        graph.add_node(name, agents_map[name])
+        graph.add_node(name, partial(run_agent_node, agent=agents_map[name], name=name))
         graph.add_edge(name, "Supervisor")
+
+    # 프로젝트별 조회는 Send 로 동시에 실행하고, 결과를 모아 한 번만 요약한다.
+    graph.add_node(
+        "ProjectDigest",
+        partial(
+            project_digest_node,
+            agents=agents_map,
+        ),
+    )
+    graph.add_node(
+        "DigestSummarizer",
+        partial(digest_summarizer_node, llm=summarizer_llm, prompt=digest_prompt),
+    )
+    graph.add_edge("ProjectDigest", "DigestSummarizer")
+    graph.add_edge("DigestSummarizer", END)
     
     graph.add_conditional_edges(
         "Supervisor",
         get_next_node,
-        {**{name: name for name in members}, "FINISH": END}
+        {**{name: name for name in members}, "ProjectDigest": "ProjectDigest", "FINISH": END}
     )
     
-    graph.set_entry_point("Supervisor")
+    graph.set_entry_point("ContextManager")
 
-    return graph.compile(checkpointer=checkpointer)
+    return graph.compile(checkpointer=get_checkpointer())
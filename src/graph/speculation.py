@@ -0,0 +1,222 @@
+import asyncio
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langgraph.constants import TAG_HIDDEN, TAG_NOSTREAM
+from langgraph.graph.state import RunnableConfig
+
+from metrics import counter, thread_id_of
+from team.bulk_save import STRUCTURED_CONFIG_KEY
+from usage import UsageCallbackHandler
+
+from .structured_state import structured_items
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Supervisor 가 결정하는 동안 가장 가능성 높은 다음 워커를 미리 실행한다. (기본 꺼짐)
+SUPERVISOR_SPECULATION = os.getenv("SUPERVISOR_SPECULATION", "false").lower() == "true"
+# 미리 실행할 수 있는 워커. interrupt() 로 사용자 입력을 받는 워커(ProjectAgent)는 넣지 않는다.
+SPECULATION_WORKERS = os.getenv("SPECULATION_WORKERS", "BacklogAgent,SprintAgent")
+# 관찰한 전이가 이 수 이상 모이면 기본 전이 대신 관찰값으로 예측하고, 이 비율 이상일 때만 실행한다.
+SPECULATION_MIN_SAMPLES = int(os.getenv("SPECULATION_MIN_SAMPLES", "5"))
+SPECULATION_MIN_CONFIDENCE = float(os.getenv("SPECULATION_MIN_CONFIDENCE", "0.6"))
+# 확정된 추측 실행을 워커 노드가 이 시간(초) 안에 가져가지 않으면 취소한다.
+SPECULATION_PENDING_TTL = float(os.getenv("SPECULATION_PENDING_TTL", "30"))
+
+START = "__start__"
+
+# 관찰값이 모이기 전에 쓰는 자주 쓰이는 생성 흐름
+DEFAULT_TRANSITIONS = {
+    "ProjectAgent": "BacklogAgent",
+    "BacklogAgent": "SprintAgent",
+}
+
+SPECULATIONS = counter(
+    "zenior_speculation_total",
+    "Speculative worker runs by worker and outcome (hit, miss, stale).",
+)
+WASTED_TOKENS = counter(
+    "zenior_speculation_wasted_tokens_total",
+    "LLM tokens spent by speculative worker runs that were discarded.",
+)
+HEAD_START_SECONDS = counter(
+    "zenior_speculation_head_start_seconds_total",
+    "Worker time already elapsed when a speculative run was kept.",
+)
+
+# 이전 워커(요청의 첫 라우팅은 START) -> 다음 워커 관찰 횟수
+transitions: Dict[str, Counter] = defaultdict(Counter)
+
+# 스레드별로 Supervisor 가 확정했지만 아직 워커 노드가 가져가지 않은 추측 실행
+_pending: Dict[str, "Speculation"] = {}
+
+def speculative_workers() -> List[str]:
+    return [name.strip() for name in SPECULATION_WORKERS.split(",") if name.strip()]
+
+def record_transition(routes: List[str], next_node: str):
+    transitions[routes[-1] if routes else START][next_node] += 1
+
+def predict_next(routes: List[str]) -> Optional[str]:
+    previous = routes[-1] if routes else START
+    observed = transitions.get(previous)
+    total = sum(observed.values()) if observed else 0
+
+    if total >= SPECULATION_MIN_SAMPLES:
+        worker, count = observed.most_common(1)[0]
+        prediction = worker if count / total >= SPECULATION_MIN_CONFIDENCE else None
+    else:
+        prediction = DEFAULT_TRANSITIONS.get(previous)
+
+    return prediction if prediction in speculative_workers() else None
+
+def _view_key(view: List[BaseMessage]) -> tuple:
+    return tuple((message.type, message.id, hash(str(message.content))) for message in view)
+
+class _TokenCounter(BaseCallbackHandler):
+    run_inline = True
+
+    def __init__(self):
+        self.tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any):
+        for generations in response.generations:
+            for generation in generations:
+                if isinstance(generation, ChatGeneration):
+                    self.tokens += (getattr(generation.message, "usage_metadata", None) or {}).get("total_tokens", 0)
+
+class Speculation:
+    """
+        그래프 밖에서(체크포인트 없이) 워커를 미리 실행한다.
+        상태를 바꾸는 MCP 툴은 commit() 될 때까지 기다리므로, 예측이 틀려 취소되면 부작용이 남지 않는다.
+    """
+    def __init__(self, name: str, agent: Any, state: Dict[str, Any], view: List[BaseMessage], config: RunnableConfig):
+        self.name = name
+        self.started = time.monotonic()
+        self._view_key = _view_key(view)
+        self._committed = asyncio.Event()
+        self._tokens = _TokenCounter()
+        self._expiry: Optional[asyncio.TimerHandle] = None
+
+        configurable = config.get("configurable", {})
+        callbacks = config.get("callbacks")
+        usage_handlers = [
+            handler for handler in (getattr(callbacks, "handlers", callbacks) or [])
+            if isinstance(handler, UsageCallbackHandler)
+        ]
+
+        self.task = asyncio.create_task(agent.ainvoke(
+            {"messages": view},
+            {
+                "configurable": {
+                    "thread_id": configurable.get("thread_id"),
+                    "token": configurable.get("token"),
+                    "user_id": configurable.get("user_id"),
+                    STRUCTURED_CONFIG_KEY: structured_items(state),
+                    "speculation": self,
+                },
+                "callbacks": [*usage_handlers, self._tokens],
+                "metadata": {"zenior_node": name},
+                "tags": [TAG_NOSTREAM, TAG_HIDDEN, "speculative"],
+            },
+        ))
+
+    async def wait_for_commit(self):
+        await self._committed.wait()
+
+    def matches(self, name: str, view: List[BaseMessage]) -> bool:
+        return name == self.name and _view_key(view) == self._view_key
+
+    def commit(self):
+        if self._expiry is not None:
+            self._expiry.cancel()
+
+        SPECULATIONS.inc(worker=self.name, outcome="hit")
+        HEAD_START_SECONDS.inc(time.monotonic() - self.started, worker=self.name)
+        self._committed.set()
+
+    def discard(self, outcome: str):
+        if self._expiry is not None:
+            self._expiry.cancel()
+
+        self.task.cancel()
+        # 취소된 태스크의 예외가 "never retrieved" 경고로 남지 않게 한다.
+        self.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        SPECULATIONS.inc(worker=self.name, outcome=outcome)
+        WASTED_TOKENS.inc(self._tokens.tokens, worker=self.name)
+
+def start_speculation(
+    routes: List[str],
+    state: Dict[str, Any],
+    config: RunnableConfig,
+    agents: Dict[str, Any],
+    build_view: Any,
+) -> Optional[Speculation]:
+    if not SUPERVISOR_SPECULATION or not thread_id_of(config):
+        return None
+
+    worker = predict_next(routes)
+
+    if worker is None or worker not in agents:
+        return None
+
+    return Speculation(worker, agents[worker], state, build_view(state, worker), config)
+
+def settle_speculation(speculation: Optional[Speculation], routes: List[str], next_node: str, config: RunnableConfig):
+    """Supervisor 의 결정과 비교해 맞으면 워커 노드가 가져가도록 남기고, 틀리면 취소한다."""
+    if SUPERVISOR_SPECULATION and next_node != "FINISH":
+        record_transition(routes, next_node)
+
+    if next_node == "FINISH":
+        discard_pending(thread_id_of(config))
+
+    if speculation is None:
+        return
+
+    if speculation.name != next_node:
+        speculation.discard("miss")
+        return
+
+    thread_id = thread_id_of(config)
+    previous = _pending.pop(thread_id, None)
+
+    if previous is not None:
+        previous.discard("stale")
+
+    _pending[thread_id] = speculation
+    # 예산 초과, 그래프 오류, 연결 끊김 등으로 워커 노드가 실행되지 않아도 남지 않게 한다.
+    speculation._expiry = asyncio.get_running_loop().call_later(
+        SPECULATION_PENDING_TTL, _expire_pending, thread_id, speculation,
+    )
+
+def _expire_pending(thread_id: str, speculation: Speculation):
+    if _pending.get(thread_id) is speculation:
+        del _pending[thread_id]
+        speculation.discard("stale")
+
+def discard_pending(thread_id: Optional[str]):
+    """스레드의 실행이 끝났을 때 호출한다. 워커 노드가 가져가지 않은 추측 실행을 취소한다."""
+    speculation = _pending.pop(thread_id, None) if thread_id and _pending else None
+
+    if speculation is not None:
+        speculation.discard("stale")
+
+def take_speculation(config: RunnableConfig, name: str, view: List[BaseMessage]) -> Optional[Speculation]:
+    """워커 노드에서 호출한다. 같은 입력으로 시작된 추측 실행이 있으면 확정해서 반환한다."""
+    speculation = _pending.pop(thread_id_of(config), None) if _pending else None
+
+    if speculation is None:
+        return None
+
+    if not speculation.matches(name, view):
+        speculation.discard("stale")
+        return None
+
+    speculation.commit()
+
+    return speculation
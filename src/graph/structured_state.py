@@ -0,0 +1,185 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+# 요약에 넣는 채널별 최대 항목 수
+SUMMARY_MAX_ITEMS = 50
+
+# 구조화된 출력이 어느 채널에 저장되었는지 표시하는 response_metadata 키
+STRUCTURED_OUTPUT_KEY = "structured_output"
+
+# 삭제된 항목 자리에 남겨두는 표시. 이후 업데이트가 같은 키를 다시 넣으면 되살아난다.
+TOMBSTONE = {"__deleted__": True}
+
+def is_tombstone(item: Any) -> bool:
+    return isinstance(item, dict) and item.get("__deleted__") is True
+
+def upsert_by_key(left: Optional[Dict[str, dict]], right: Optional[Dict[str, dict]]) -> Dict[str, dict]:
+    """
+        키 단위로 upsert 한다. 같은 키는 새 값으로 덮어쓰고 나머지는 유지하며,
+        TOMBSTONE 이 들어오면 해당 항목을 삭제 표시로 바꾼다.
+        변경이 없으면 기존 dict 를 그대로 반환한다.
+    """
+    if not right:
+        return left or {}
+
+    merged = dict(left or {})
+    changed = False
+
+    for key, item in right.items():
+        if merged.get(key) != item:
+            merged[key] = item
+            changed = True
+
+    return merged if changed else (left or {})
+
+def live_items(items: Optional[Dict[str, dict]]) -> Dict[str, dict]:
+    """삭제 표시된 항목을 제외한다."""
+    return {key: item for key, item in (items or {}).items() if not is_tombstone(item)}
+
+def _dump(item: Any) -> dict:
+    return item.model_dump(mode="json") if isinstance(item, BaseModel) else dict(item)
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+
+    return value if isinstance(value, list) else [value]
+
+def _scoped_key(project_id: Optional[str], key: Any) -> str:
+    """프로젝트가 다르면 같은 제목/번호라도 다른 항목으로 색인한다."""
+    return f"{project_id}:{key}" if project_id else str(key)
+
+def index_backlogs(backlogs: Any, project_id: Optional[str] = None) -> Dict[str, dict]:
+    """백로그는 ID 가 없을 수 있으므로 id 가 있으면 id, 없으면 title 로 색인한다."""
+    indexed = {}
+
+    for backlog in _as_list(backlogs):
+        item = {**_dump(backlog), "project_id": project_id}
+        indexed[_scoped_key(project_id, item.get("id") or item["title"])] = item
+
+    return indexed
+
+def index_sprints(sprints: Any, project_id: Optional[str] = None) -> Dict[str, dict]:
+    indexed = {}
+
+    for sprint in _as_list(sprints):
+        item = {**_dump(sprint), "project_id": project_id}
+        indexed[_scoped_key(project_id, item.get("id") or item["sprint_number"])] = item
+
+    return indexed
+
+STRUCTURED_CHANNELS = {
+    "backlogs": index_backlogs,
+    "sprints": index_sprints,
+}
+
+# 서버 ID 가 없을 때 항목을 가리키는 필드. 삭제(deleted)도 이 값으로 들어온다.
+NAME_FIELDS = {
+    "backlogs": "title",
+    "sprints": "sprint_number",
+}
+
+def structured_items(state: Dict[str, Any]) -> Dict[str, List[dict]]:
+    """워커의 툴(일괄 저장 등)에 넘겨줄 현재 백로그/스프린트 목록. 항목마다 project_id 가 들어 있다."""
+    return {channel: list(live_items(state.get(channel)).values()) for channel in STRUCTURED_CHANNELS}
+
+def _matching_keys(items: Dict[str, dict], channel: str, project_id: Optional[str], ref: Any) -> List[str]:
+    """
+        서버 ID 또는 제목/번호(ref)가 가리키는 기존 항목의 키.
+        같은 프로젝트의 항목과, 프로젝트가 정해지기 전에 만들어진(project_id 없는) 항목만 찾는다.
+    """
+    ref = str(ref)
+
+    return [
+        key for key, item in live_items(items).items()
+        if item.get("project_id") in (project_id, None)
+        and ref in (str(item.get("id")), str(item.get(NAME_FIELDS[channel])))
+    ]
+
+def structured_update(structured_response: Any, state: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, dict]]:
+    """
+        에이전트의 response_format 출력(BacklogOutput, SprintOutput)을 채널 업데이트로 바꾼다.
+        워커는 출력을 JSON dict 로 돌려주지만, 이전 체크포인트에 남은 pydantic 출력도 받는다.
+        state 가 있으면 삭제와 프로젝트 확정을 기존 항목의 실제 키(서버 ID 또는 프로젝트 없는 키)에 반영한다.
+    """
+    if structured_response is None:
+        return {}
+
+    if isinstance(structured_response, BaseModel):
+        structured_response = structured_response.model_dump(mode="json")
+
+    update = {}
+    # 항목마다 어느 프로젝트의 것인지 남겨, 다른 프로젝트에서 조회한 항목과 섞이지 않게 한다.
+    project_id = structured_response.get("project_id")
+
+    for channel, index in STRUCTURED_CHANNELS.items():
+        value = structured_response.get(channel)
+
+        if value is not None:
+            update[channel] = index(value, project_id)
+
+    # 삭제된 항목 키는 출력에 해당하는 채널(출력 모델에 들어 있는 채널)에 삭제 표시로 남긴다.
+    deleted = structured_response.get("deleted") or []
+
+    for channel in update:
+        existing = (state or {}).get(channel) or {}
+
+        # 프로젝트가 정해지기 전에 만든 항목이 프로젝트 키로 다시 들어오면 이전 키는 지운다.
+        if project_id:
+            for item in list(update[channel].values()):
+                for ref in (item.get("id"), item.get(NAME_FIELDS[channel])):
+                    for key in _matching_keys(existing, channel, None, ref) if ref is not None else []:
+                        update[channel].setdefault(key, TOMBSTONE)
+
+        for ref in deleted:
+            keys = _matching_keys(existing, channel, project_id, ref) or [_scoped_key(project_id, ref)]
+
+            for key in keys:
+                update[channel].setdefault(key, TOMBSTONE)
+
+    return update
+
+def _project_tag(item: dict) -> str:
+    return f"[{item['project_id']}] " if item.get("project_id") else ""
+
+def _backlog_line(item: dict) -> str:
+    return (
+        f"- {_project_tag(item)}{item['title']} | P{item.get('priority') or '-'} | {item.get('status')}"
+        f" | {item.get('start_date') or '?'}~{item.get('end_date') or '?'}"
+    )
+
+def _sprint_line(item: dict) -> str:
+    backlog_ids = ", ".join(item.get("backlog_ids") or [])
+
+    return (
+        f"- {_project_tag(item)}Sprint {item['sprint_number']} {item['name']} | {item.get('status')}"
+        f" | {item.get('start_date')}~{item.get('end_date')}"
+        f" | goal: {item.get('goal') or '-'} | backlogs: {backlog_ids or '-'}"
+    )
+
+_FORMATTERS = {
+    "backlogs": ("백로그", _backlog_line),
+    "sprints": ("스프린트", _sprint_line),
+}
+
+def summarize_structured(state: Dict[str, Any]) -> Optional[str]:
+    """상태에 저장된 백로그/스프린트를 한 줄씩 요약한다. 비어 있으면 None."""
+    sections = []
+
+    for channel, (title, format_line) in _FORMATTERS.items():
+        items = list(live_items(state.get(channel)).values())
+
+        if not items:
+            continue
+
+        lines = [format_line(item) for item in items[:SUMMARY_MAX_ITEMS]]
+
+        if len(items) > SUMMARY_MAX_ITEMS:
+            lines.append(f"- ... 외 {len(items) - SUMMARY_MAX_ITEMS}건")
+
+        sections.append(f"### {title} ({len(items)}건)\n" + "\n".join(lines))
+
+    if not sections:
+        return None
+
+    return "## 현재 작업 중인 데이터\n" + "\n\n".join(sections)
@@ -37,6 +37,7 @@ class ChatRequest(BaseModel):
     tools: Optional[Dict[str, Any]] = Field(None, description="Available tools")
     runConfig: Optional[Dict[str, Any]] = Field(None, description="Run configuration")
     state: Optional[Dict[str, Any]] = Field(None, description="State")
+    stateVersion: Optional[int] = Field(None, description="Version of the state the client last received")
     threadId: Optional[str] = Field(None, description="Thread ID")
 
 class ResumeChatRequest(BaseModel):
@@ -0,0 +1,78 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MODEL_NAME = "gpt-4o"
+# 모든 ChatOpenAI 가 같은 재시도/타임아웃 정책과 커넥션 풀을 쓴다.
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_http_client: Optional[httpx.AsyncClient] = None
+_models: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], BaseChatModel] = {}
+_override: Optional[BaseChatModel] = None
+
+def _shared_http_client() -> httpx.AsyncClient:
+    """OpenAI 호출이 함께 쓰는 keep-alive 커넥션 풀. TLS 핸드셰이크를 요청마다 반복하지 않는다."""
+    global _http_client
+
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(OPENAI_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    return _http_client
+
+def get_chat_model(model: str = MODEL_NAME, **options: Any) -> BaseChatModel:
+    """
+        모델/옵션 조합마다 하나의 ChatOpenAI 를 만들어 재사용한다.
+        set_chat_model_override 로 대체 모델이 지정되어 있으면 그 모델을 반환한다.
+    """
+    if _override is not None:
+        return _override
+
+    key = (model, tuple(sorted(options.items())))
+
+    if key not in _models:
+        _models[key] = ChatOpenAI(
+            model=model,
+            timeout=OPENAI_TIMEOUT,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_async_client=_shared_http_client(),
+            **options,
+        )
+
+    return _models[key]
+
+def set_chat_model_override(model: Optional[BaseChatModel]):
+    """모든 get_chat_model 호출이 model 을 반환하게 한다. (테스트/벤치마크용, None 이면 해제)"""
+    global _override
+    _override = model
+
+async def close_chat_models():
+    global _http_client
+
+    _models.clear()
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
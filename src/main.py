@@ -1,12 +1,17 @@
+import hmac
 import json
+import os
+import time
+from contextlib import asynccontextmanager
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import Command
 from pydantic import BaseModel
 from typing_extensions import Optional, List, Any
 import uuid
 from fastapi.security import HTTPAuthorizationCredentials
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from assistant_stream import RunController, append_langgraph_event, create_run, get_tool_call_subgraph_state
 from assistant_stream.serialization import DataStreamResponse
 from dotenv import load_dotenv
@@ -16,12 +21,66 @@ from interal_types import ChatRequest
 
 load_dotenv()
 
-from graph import create_scrum_agent_graph
-from auth import security, verify_token
+from graph import (
+    get_scrum_agent_graph,
+    open_checkpointer,
+    close_checkpointer,
+    start_checkpoint_compaction,
+    stop_checkpoint_compaction,
+    has_pending_interrupt,
+    get_router_stats,
+    run_deadline,
+    discard_pending,
+)
+from auth import security, verify_token, token_cache
+from metrics import METRICS_SCRAPE_TOKEN, gauge_samples, histogram, register_collector, render, span
+from streaming import StreamCoalescer
+from structured_stream import StructuredItemStream
+from thread_state import VERSION_KEY, final_state, thread_states
+from usage import BUDGET_MESSAGES, UsageCallbackHandler, usage_ledger
+from team.mcp_utils import BearerToken, close_mcp_pool, get_mcp_tool_cache_stats
+from llm import close_chat_models
 
 import uvicorn 
 
-app = FastAPI(dependencies=[Depends(verify_token)])
+FIRST_EVENT_SECONDS = histogram(
+    "zenior_stream_first_event_seconds",
+    "Time from graph start to the first streamed frame.",
+)
+
+def collect_cache_stats():
+    return [
+        gauge_samples("zenior_router_decisions", "Supervisor routing decisions by rule or LLM.", get_router_stats(), "route"),
+        gauge_samples("zenior_auth_token_cache", "Verified token cache counters.", token_cache.stats(), "stat"),
+        gauge_samples("zenior_mcp_tool_cache", "MCP read tool result cache counters.", get_mcp_tool_cache_stats(), "stat"),
+        gauge_samples("zenior_thread_state_cache", "Server-side thread UI state cache counters.", thread_states.stats(), "stat"),
+    ]
+
+register_collector(collect_cache_stats)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_checkpoint_compaction(await open_checkpointer())
+
+    # 그래프를 미리 컴파일해 첫 요청의 지연을 줄인다.
+    # MCP 툴 스키마 조회용 토큰이 없으면 첫 요청에서 툴을 불러온다.
+    try:
+        await get_scrum_agent_graph({
+            "configurable": {
+                "token": os.getenv("ZENIOR_MCP_DISCOVERY_TOKEN")
+            }
+        })
+    except Exception as e:
+        print(f"⚠️  Warning: Graph warm-up failed: {e}")
+
+    yield
+
+    await stop_checkpoint_compaction()
+    await close_mcp_pool()
+    await close_chat_models()
+    await close_checkpointer()
+
+app = FastAPI(dependencies=[Depends(verify_token)], lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,9 +92,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.get("/health", dependencies=[])
-def health_check():
-    return {"status": "ok"}
+# 라우트의 dependencies=[] 로는 앱 전체의 verify_token 을 끌 수 없으므로,
+# 헬스 체크와 스크레이프 엔드포인트는 의존성을 거치지 않는 Starlette 라우트로 등록한다.
+def health_check(request: Request):
+    return JSONResponse({"status": "ok"})
+
+def metrics(request: Request):
+    if METRICS_SCRAPE_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {METRICS_SCRAPE_TOKEN}"
+    ):
+        return PlainTextResponse("Unauthorized", status_code=401)
+
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+app.add_route("/health", health_check, methods=["GET"])
+app.add_route("/metrics", metrics, methods=["GET"])
 
 @app.post("/threads")
 def create_thread(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -45,12 +116,52 @@ def create_thread(credentials: HTTPAuthorizationCredentials = Depends(security))
 
     return {"thread_id": str(uuid.uuid4())}
 
+@app.get("/threads/{thread_id}/usage")
+def thread_usage(thread_id: str, claims: dict = Depends(verify_token)):
+    usage = usage_ledger.get_for_user(thread_id, claims.get("sub"))
+
+    # 다른 사용자의 스레드는 없는 것처럼 처리한다.
+    if usage is None:
+        raise HTTPException(status_code=404, detail="Usage not found")
+
+    return usage
+
 @app.post("/assistant")
 async def chat_endpoint(
     request: ChatRequest,
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    claims: dict = Depends(verify_token),
 ):
+    user_id = claims.get("sub")
+
+    if usage_ledger.budget_exceeded(None, user_id) == "user":
+        raise HTTPException(status_code=429, detail=BUDGET_MESSAGES["user"])
+
+    # 클라이언트가 가진 버전이 서버 사본과 같으면 상태를 다시 받지 않고 변경분만 보낸다.
+    try:
+        base_state, state_version, resync = await thread_states.resolve(
+            request.threadId,
+            user_id,
+            request.stateVersion,
+            request.state,
+        )
+    except PermissionError:
+        # 다른 사용자의 스레드는 없는 것처럼 처리한다.
+        raise HTTPException(status_code=404, detail="Thread not found")
+
     async def run(controller: RunController):
+        try:
+            await stream_run(controller)
+        except BaseException:
+            # 실패하거나 취소되기 전에 보낸 변경분이 클라이언트에 반영되었을 수 있으므로
+            # 서버 사본을 버려 다음 요청이 오래된 상태를 기준으로 diff 하지 않게 한다.
+            thread_states.invalidate(request.threadId)
+            raise
+        finally:
+            # 워커 노드까지 가지 못하고 끝난 추측 실행이 남아 있으면 취소한다.
+            discard_pending(request.threadId)
+
+    async def stream_run(controller: RunController):
         token = credentials.credentials
         if not token:
             raise HTTPException(status_code=401, detail="Unauthorized")
@@ -58,15 +169,21 @@ async def chat_endpoint(
         config = {
           "configurable": {
             "thread_id": request.threadId,
-            "token": token
-          }
+            "token": BearerToken(token),
+            "user_id": user_id,
+            "deadline": run_deadline(),
+          },
+          "callbacks": [UsageCallbackHandler(request.threadId, user_id)],
         }
 
         try:
-          graph = await create_scrum_agent_graph(config)
+          graph = await get_scrum_agent_graph(config)
         except Exception as e:
           raise HTTPException(status_code=500, detail=str(e))
 
+        if resync:
+            controller.state = base_state
+
         if controller.state is None:
             controller.state = {}
         if "messages" not in controller.state:
@@ -99,44 +216,66 @@ async def chat_endpoint(
         for message in input_messages:
             controller.state["messages"].append(message.model_dump())
 
-        snapshot = graph.get_state(config)
         run_input = None
 
-        if snapshot.next and is_tool_result:
+        if is_tool_result and await has_pending_interrupt(graph.checkpointer, config):
             run_input = Command(resume=tool_result)
 
         else:
             run_input = {"messages": input_messages}
 
-        async for namespace, event_type, chunk in graph.astream(
-            run_input,
-            config,
-            stream_mode=["messages", "updates"],
-            subgraphs=True
-        ):
-            if event_type == "messages":
-                msg, metadata = chunk
-
-                if isinstance(msg, (AIMessage, AIMessageChunk)):
-                    if not msg.content and not msg.tool_calls:
-                        continue
+        coalesce = StreamCoalescer(controller)
+        partials = StructuredItemStream()
+        started = time.perf_counter()
+        first_event = True
+
+        with span("stream", thread_id=request.threadId):
+            async for namespace, event_type, chunk in coalesce(graph.astream(
+                run_input,
+                config,
+                stream_mode=["messages", "updates"],
+                subgraphs=True
+            )):
+                if event_type == "messages":
+                    msg, metadata = chunk
+
+                    if isinstance(msg, (AIMessage, AIMessageChunk)):
+                        if not msg.content and not msg.tool_calls:
+                            continue
                 
-            state = get_tool_call_subgraph_state(
-                controller,
-                subgraph_node="tools",
-                namespace=namespace,
-                artifact_field_name="subgraph_state",
-                default_state={}
-            )
-
-            append_langgraph_event(
-                state,
-                namespace,
-                event_type,
-                chunk
-            )
-
-    return DataStreamResponse(create_run(run, state=request.state))
+                state = get_tool_call_subgraph_state(
+                    controller,
+                    subgraph_node="tools",
+                    namespace=namespace,
+                    artifact_field_name="subgraph_state",
+                    default_state={}
+                )
+
+                append_langgraph_event(
+                    state,
+                    namespace,
+                    event_type,
+                    chunk
+                )
+
+                # 백로그/스프린트 항목은 구조화된 출력이 끝나기 전에 완성되는 대로 보낸다.
+                for partial_namespace, partial_type, partial in partials(namespace, event_type, chunk):
+                    append_langgraph_event(controller.state, partial_namespace, partial_type, partial)
+
+                if first_event:
+                    first_event = False
+                    FIRST_EVENT_SECONDS.observe(time.perf_counter() - started)
+
+        usage_ledger.log_turn(request.threadId)
+
+        controller.state[VERSION_KEY] = state_version + 1
+
+        latest = final_state(controller.state)
+
+        if request.threadId and latest is not None:
+            thread_states.put(request.threadId, state_version + 1, latest, user_id)
+
+    return DataStreamResponse(create_run(run, state=base_state))
 
 if __name__ == '__main__':
     uvicorn.run(
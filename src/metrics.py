@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from langgraph.errors import GraphBubbleUp
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("zenior-agent")
+except ImportError:
+    _tracer = None
+
+# OpenTelemetry SDK/exporter 가 설정되어 있으면 단계별 span 도 함께 남긴다.
+METRICS_OTEL_ENABLED = os.getenv("METRICS_OTEL_ENABLED", "true").lower() == "true"
+# 지정하면 /metrics 는 "Authorization: Bearer <이 값>" 요청만 받는다. 비우면 인증 없이 공개한다.
+METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN", "")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in self._values.items())
+
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # 라벨별 [버킷별 개수..., 합계, 개수]
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect_left(self.buckets, value)
+
+            if index < len(self.buckets):
+                series[index] += 1
+
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+
+        return lines
+
+# (이름, 타입, 설명, {라벨: 값}) 을 돌려주는 함수. 모듈별 캐시 통계 등을 그대로 노출할 때 쓴다.
+Collector = Callable[[], List[Tuple[str, str, str, Dict[Labels, float]]]]
+
+_metrics: List[Any] = []
+_collectors: List[Collector] = []
+
+def counter(name: str, help: str) -> Counter:
+    metric = Counter(name, help)
+    _metrics.append(metric)
+
+    return metric
+
+def histogram(name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, buckets)
+    _metrics.append(metric)
+
+    return metric
+
+def register_collector(collector: Collector):
+    _collectors.append(collector)
+
+def gauge_samples(name: str, help: str, values: Dict[str, float], label: str) -> Tuple[str, str, str, Dict[Labels, float]]:
+    """{라벨값: 값} 형태의 통계를 collector 반환 형식으로 바꾼다."""
+    return name, "gauge", help, {((label, key),): value for key, value in values.items()}
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+
+    for metric in _metrics:
+        lines.extend(metric.render())
+
+    for collector in _collectors:
+        try:
+            samples = collector()
+        except Exception as e:
+            print(f"⚠️  Warning: Metrics collector failed: {e}")
+            continue
+
+        for name, kind, help, values in samples:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in values.items())
+
+    return "\n".join(lines) + "\n"
+
+STAGE_SECONDS = histogram(
+    "zenior_stage_duration_seconds",
+    "Duration of each /assistant pipeline stage.",
+)
+
+def thread_id_of(config: Optional[dict]) -> Optional[str]:
+    return (config or {}).get("configurable", {}).get("thread_id")
+
+@contextmanager
+def span(stage: str, name: str = "", thread_id: Optional[str] = None, **attributes) -> Iterator[Dict[str, Any]]:
+    """
+        단계 실행 시간을 히스토그램(stage, name, status 라벨)에 기록하고,
+        OpenTelemetry 가 있으면 thread_id 등을 속성으로 가진 span 을 만든다.
+        thread_id 는 라벨 수가 무한히 늘어나므로 히스토그램 라벨에는 넣지 않는다.
+
+        yield 된 dict 의 "name" 을 바꾸면 실행 도중에 정해진 이름(라우팅 결과 등)으로 기록된다.
+    """
+    labels = {"name": name}
+    started = time.perf_counter()
+    status = "ok"
+
+    otel = nullcontext()
+
+    if _tracer is not None and METRICS_OTEL_ENABLED:
+        otel = _tracer.start_as_current_span(
+            f"zenior.{stage}",
+            attributes={
+                "zenior.stage": stage,
+                "zenior.name": name,
+                **({"zenior.thread_id": thread_id} if thread_id else {}),
+                **{f"zenior.{key}": str(value) for key, value in attributes.items()},
+            },
+        )
+
+    with otel:
+        try:
+            yield labels
+        except GraphBubbleUp:
+            # interrupt() 로 사용자 입력을 기다리는 경우는 오류가 아니다.
+            status = "interrupted"
+            raise
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            STAGE_SECONDS.observe(
+                time.perf_counter() - started,
+                stage=stage,
+                name=labels["name"],
+                status=status,
+            )
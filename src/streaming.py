@@ -0,0 +1,232 @@
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from langchain_core.messages import AIMessageChunk
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 같은 메시지의 토큰 청크를 이 시간(ms) 또는 글자 수만큼 모아 한 프레임으로 보낸다.
+STREAM_COALESCE_WINDOW_MS = float(os.getenv("STREAM_COALESCE_WINDOW_MS", "50"))
+STREAM_COALESCE_MAX_CHARS = int(os.getenv("STREAM_COALESCE_MAX_CHARS", "512"))
+# 클라이언트로 보내지 못하고 쌓인 프레임이 이 수를 넘으면 줄어들 때까지 이벤트를 더 모은다.
+STREAM_BACKPRESSURE_HIGH_WATER = int(os.getenv("STREAM_BACKPRESSURE_HIGH_WATER", "256"))
+
+StreamEvent = Tuple[Tuple[str, ...], str, Any]
+
+_DONE = object()
+
+_missing_queue_warned = False
+
+def _size(chunk: AIMessageChunk) -> int:
+    return len(chunk.text) + sum(len(call.get("args") or "") for call in chunk.tool_call_chunks)
+
+def _controller_queue(controller: Any) -> Optional[asyncio.Queue]:
+    """
+        RunController 가 클라이언트로 보낼 청크를 쌓는 큐.
+        assistant_stream 이 공개하지 않는 속성이라 버전이 바뀌어 없어지면 경고하고 백프레셔 없이 합치기만 한다.
+    """
+    global _missing_queue_warned
+
+    if controller is None:
+        return None
+
+    queue = getattr(controller, "_queue", None)
+
+    if callable(getattr(queue, "qsize", None)):
+        return queue
+
+    if not _missing_queue_warned:
+        _missing_queue_warned = True
+        print(f"⚠️  Warning: {type(controller).__name__} has no chunk queue; stream backpressure is disabled")
+
+    return None
+
+class StreamCoalescer:
+    """
+        graph.astream(stream_mode=["messages", "updates"], subgraphs=True) 이벤트를
+        클라이언트로 보내기 전에 정리한다.
+
+        - 같은 네임스페이스/메시지의 연속된 토큰 청크는 하나로 합친다.
+        - messages 스트림으로 이미 전달된 메시지만 담은 updates 와 값이 바뀌지 않은 채널은 버린다.
+        - 클라이언트가 느려 RunController 큐가 쌓이면 큐가 줄어들 때까지 보내지 않고 더 모은다.
+    """
+    def __init__(
+        self,
+        controller: Any = None,
+        window_ms: float = STREAM_COALESCE_WINDOW_MS,
+        max_chars: int = STREAM_COALESCE_MAX_CHARS,
+        high_water: int = STREAM_BACKPRESSURE_HIGH_WATER,
+    ):
+        self.window = window_ms / 1000
+        self.max_chars = max_chars
+        self.high_water = high_water
+        self._queue = _controller_queue(controller)
+        self._last_updates: Dict[Tuple[Tuple[str, ...], str], Any] = {}
+        self._pending: Optional[StreamEvent] = None
+        self._pending_since = 0.0
+        self.received = 0
+        self.emitted = 0
+
+    def _congested(self) -> bool:
+        return self._queue is not None and self._queue.qsize() > self.high_water
+
+    def _can_merge(self, event: StreamEvent) -> bool:
+        if self._pending is None:
+            return False
+
+        namespace, _, (message, _) = event
+        pending_namespace, _, (pending, _) = self._pending
+
+        return (
+            namespace == pending_namespace
+            and isinstance(message, AIMessageChunk)
+            and isinstance(pending, AIMessageChunk)
+            and message.id == pending.id
+        )
+
+    def _filter_updates(self, namespace: Tuple[str, ...], payload: Any) -> Optional[dict]:
+        if not isinstance(payload, dict):
+            return payload
+
+        filtered = {}
+
+        for node, channels in payload.items():
+            if not isinstance(channels, dict):
+                filtered[node] = channels
+                continue
+
+            changed = {}
+
+            for channel, value in channels.items():
+                # 메시지는 messages 스트림으로 이미 전달된다.
+                if channel == "messages":
+                    continue
+
+                key = (namespace, channel)
+
+                if key in self._last_updates and self._last_updates[key] == value:
+                    continue
+
+                self._last_updates[key] = value
+                changed[channel] = value
+
+            if changed:
+                filtered[node] = changed
+
+        return filtered or None
+
+    def _take_pending(self) -> Optional[StreamEvent]:
+        pending, self._pending = self._pending, None
+
+        if pending is not None:
+            self.emitted += 1
+
+        return pending
+
+    def _should_flush(self) -> bool:
+        if self._pending is None:
+            return False
+
+        _, _, (message, _) = self._pending
+
+        # 토큰 청크가 아닌 메시지(툴 결과 등)는 모을 필요가 없다.
+        if not isinstance(message, AIMessageChunk) or _size(message) >= self.max_chars:
+            return True
+
+        if self._congested():
+            return False
+
+        return time.monotonic() - self._pending_since >= self.window
+
+    def _push(self, event: StreamEvent):
+        """이벤트를 버퍼에 넣는다. 합칠 수 없으면 버퍼에 있던 이벤트를 반환한다."""
+        namespace, event_type, payload = event
+
+        if self._can_merge(event):
+            message, metadata = payload
+            pending_message, pending_metadata = self._pending[2]
+            self._pending = (namespace, event_type, (pending_message + message, pending_metadata))
+
+            return None
+
+        flushed = self._take_pending()
+        self._pending = event
+        self._pending_since = time.monotonic()
+
+        return flushed
+
+    async def __call__(self, source: AsyncIterator[StreamEvent]) -> AsyncIterator[StreamEvent]:
+        # 타임아웃으로 source 의 __anext__ 를 취소하지 않도록 별도 태스크가 읽어 큐에 넣는다.
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=max(self.high_water, 1))
+
+        async def pump():
+            try:
+                async for event in source:
+                    await inbox.put(event)
+            except Exception as e:
+                await inbox.put(e)
+            else:
+                await inbox.put(_DONE)
+
+        reader = asyncio.create_task(pump())
+
+        try:
+            while True:
+                timeout = None
+
+                if self._pending is not None:
+                    timeout = max(self._pending_since + self.window - time.monotonic(), 0)
+
+                    if self._congested():
+                        timeout = self.window
+
+                try:
+                    item = await asyncio.wait_for(inbox.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if self._should_flush():
+                        yield self._take_pending()
+                    continue
+
+                if item is _DONE:
+                    break
+
+                if isinstance(item, Exception):
+                    raise item
+
+                self.received += 1
+                namespace, event_type, payload = item
+
+                if event_type == "updates":
+                    payload = self._filter_updates(namespace, payload)
+
+                    if payload is None:
+                        continue
+
+                    flushed = self._take_pending()
+
+                    if flushed is not None:
+                        yield flushed
+
+                    self.emitted += 1
+                    yield namespace, event_type, payload
+
+                    continue
+
+                flushed = self._push((namespace, event_type, payload))
+
+                if flushed is not None:
+                    yield flushed
+
+                if self._should_flush():
+                    yield self._take_pending()
+
+            pending = self._take_pending()
+
+            if pending is not None:
+                yield pending
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
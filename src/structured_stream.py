@@ -0,0 +1,185 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type
+from langchain_core.messages import AIMessageChunk
+from pydantic import BaseModel, ValidationError
+
+from metrics import counter
+from team.backlog import Backlog
+from team.sprint import Sprint
+from usage import node_of
+
+# 구조화된 출력(BacklogOutput, SprintOutput)의 최상위 필드 -> 항목 스키마
+STRUCTURED_ITEMS: Dict[str, Type[BaseModel]] = {
+    "backlogs": Backlog,
+    "sprints": Sprint,
+}
+# ToolStrategy 로 구조화된 출력을 만들 때의 툴 이름
+STRUCTURED_TOOLS = {"BacklogOutput", "SprintOutput"}
+
+PARTIAL_PREFIX = "partial_"
+
+PARTIAL_ITEMS = counter(
+    "zenior_stream_partial_items_total",
+    "Structured output items streamed before the agent finished.",
+)
+
+class JsonItemParser:
+    """
+        토큰 단위로 들어오는 JSON 객체에서 최상위 필드의 항목이 닫히는 즉시 꺼낸다.
+        {"backlogs": [{...}, {...}], "sprints": {...}} 에서 배열의 각 객체와 필드 값인 객체가 항목이다.
+    """
+    def __init__(self):
+        self.buffer = ""
+        self._position = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self._item_depth = 0
+        self.failed = False
+
+    def feed(self, text: str) -> List[Tuple[str, dict]]:
+        if self.failed:
+            return []
+
+        self.buffer += text
+        items = []
+
+        while self._position < len(self.buffer):
+            index = self._position
+            char = self.buffer[index]
+            self._position += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+
+                    if self._expect_key and len(self._stack) == 1:
+                        self._key = json.loads(self.buffer[self._string_start:index + 1])
+                        self._expect_key = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                if not self._stack and char != "{":
+                    self.failed = True
+                    return items
+
+                if char == "{" and self._item_start is None and self._is_item_position():
+                    self._item_start = index
+                    self._item_depth = len(self._stack)
+
+                self._stack.append(char)
+                self._expect_key = len(self._stack) == 1
+            elif char in "}]":
+                if not self._stack:
+                    self.failed = True
+                    return items
+
+                self._stack.pop()
+
+                if self._item_start is not None and len(self._stack) == self._item_depth:
+                    items.append((self._key, json.loads(self.buffer[self._item_start:index + 1])))
+                    self._item_start = None
+            elif char == "," and len(self._stack) == 1:
+                self._expect_key = True
+            elif not self._stack and not char.isspace():
+                # JSON 이 아닌 일반 답변
+                self.failed = True
+                return items
+
+        return items
+
+    def _is_item_position(self) -> bool:
+        if self._key not in STRUCTURED_ITEMS:
+            return False
+
+        return self._stack == ["{"] or self._stack == ["{", "["]
+
+class StructuredItemStream:
+    """
+        messages 스트림에서 구조화된 출력을 만드는 토큰을 읽어, 항목이 완성될 때마다
+        partial_<필드> 채널 updates 이벤트를 만든다. 최상위 그래프 노드의 업데이트가 오면
+        (해당 워커가 끝났으므로) 채널을 비운다.
+    """
+    def __init__(self):
+        self._parsers: Dict[Tuple[str, Any], JsonItemParser] = {}
+        self._tool_indexes: Dict[Tuple[str, Any], bool] = {}
+        self._partials: Dict[str, Dict[str, List[dict]]] = {}
+
+    def __call__(self, namespace: Tuple[str, ...], event_type: str, payload: Any) -> List[Tuple[Tuple[str, ...], str, Any]]:
+        if event_type == "updates":
+            return self._finish() if not namespace else []
+
+        message, metadata = payload
+
+        if not isinstance(message, AIMessageChunk):
+            return []
+
+        node = node_of(metadata)
+        items = []
+
+        if message.text:
+            items += self._parser(message.id, None).feed(message.text)
+
+        for call in message.tool_call_chunks:
+            key = (message.id, call.get("index"))
+
+            if call.get("name"):
+                self._tool_indexes[key] = call["name"] in STRUCTURED_TOOLS
+
+            if self._tool_indexes.get(key) and call.get("args"):
+                items += self._parser(*key).feed(call["args"])
+
+        return self._emit(node, items)
+
+    def _parser(self, message_id: Any, index: Any) -> JsonItemParser:
+        key = (message_id, index)
+
+        if key not in self._parsers:
+            self._parsers[key] = JsonItemParser()
+
+        return self._parsers[key]
+
+    def _emit(self, node: str, items: List[Tuple[str, dict]]) -> List[Tuple[Tuple[str, ...], str, Any]]:
+        partials = self._partials.setdefault(node, {})
+        changed = set()
+
+        for field, item in items:
+            try:
+                value = STRUCTURED_ITEMS[field].model_validate(item).model_dump(mode="json")
+            except ValidationError:
+                continue
+
+            partials.setdefault(field, []).append(value)
+            changed.add(field)
+            PARTIAL_ITEMS.inc(field=field)
+
+        if not changed:
+            return []
+
+        return [((), "updates", {node: {
+            f"{PARTIAL_PREFIX}{field}": list(partials[field]) for field in sorted(changed)
+        }})]
+
+    def _finish(self) -> List[Tuple[Tuple[str, ...], str, Any]]:
+        events = [
+            ((), "updates", {node: {f"{PARTIAL_PREFIX}{field}": None for field in partials}})
+            for node, partials in self._partials.items()
+            if partials
+        ]
+
+        self._partials.clear()
+        self._parsers.clear()
+        self._tool_indexes.clear()
+
+        return events
@@ -1,8 +1,7 @@
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
 from langchain.agents import create_agent, structured_output
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langgraph.graph.state import RunnableConfig
 from langgraph.types import interrupt
 from pydantic import BaseModel, Field
@@ -10,6 +9,9 @@ from pydantic import BaseModel, Field
 from ..hand_off_agent import create_interactive_agent
 from .prompt import prompt
 from ..mcp_utils import setup_mcp_tools
+from ..bulk_save import BACKLOG_TARGET, bulk_save
+from ..structured_output import JsonStructuredResponse
+from llm import get_chat_model
 
 class BacklogStatus(str, Enum):
     TODO = "TODO"
@@ -22,6 +24,7 @@ class Backlog(BaseModel):
     """
     Schema for Backlog entity, matching the Service (Core) Schema.
     """
+    id: Optional[str] = Field(default=None, description="Server ID when the item was read from the server. null for newly generated items")
     title: str = Field(description="Title of the backlog item")
     description: str = Field(description="Detailed description")
     priority: Optional[int] = Field(description="Priority level (e.g., 1-5)")
@@ -30,30 +33,33 @@ class Backlog(BaseModel):
     status: BacklogStatus = Field(default=BacklogStatus.TODO, description="Status of the backlog item")
 
 class BacklogOutput(BaseModel):
+    project_id: Optional[str] = Field(description="ID of the project these backlog items belong to. null if no project is selected yet.")
     backlogs: List[Backlog]
+    deleted: List[str] = Field(description="Titles of backlog items removed in this revision. Empty list if none.")
 
-async def create_backlog_agent(config: RunnableConfig):
-
+@tool
+async def save_backlogs(project_id: str, config: RunnableConfig) -> str:
+    """
+    Save all backlog items currently under review to the project in one call.
+    Use this tool instead of calling create tools one by one when the supervisor asks to save after user confirmation.
+    Items that already exist in the project are skipped, and the result lists saved, skipped and failed items.
+    """
+    return await bulk_save(BACKLOG_TARGET, project_id, config)
 
-    # 타임아웃 및 재시도 설정 추가
-    llm = ChatOpenAI(
-        model="gpt-4o", 
-        use_responses_api=True,
-        timeout=120,
-        max_retries=3,
-        request_timeout=120,
-        name="BacklogAgent",
-    )
+async def create_backlog_agent(config: RunnableConfig, mcp_tools: Optional[List[Any]] = None):
 
-    tools = []
+    if mcp_tools is None:
+        mcp_tools = await setup_mcp_tools(config)
 
-    mcp_tools = await setup_mcp_tools(config)
+    # 일괄 저장은 MCP 툴을 쓰므로 MCP 툴이 있을 때만 준다.
+    tools = [save_backlogs] if mcp_tools else []
 
     agent = create_agent(
-        model="gpt-4o",
+        model=get_chat_model(),
         system_prompt=prompt,
         tools=[*tools, *mcp_tools],
         response_format=BacklogOutput,
+        middleware=[JsonStructuredResponse()],
     )
 
     return agent
\ No newline at end of file
@@ -27,6 +27,7 @@ prompt="""
   4. 백로그 상세 정보를 supervisor에게 제시해 사용자 검토를 받을 것
   5. supervisor 확인을 기다린 후 저장할 것
   6. supervisor가 명시적으로 요청할 때만 저장할 것
+  7. 저장할 때는 `create_backlog`를 항목마다 호출하지 말고 `save_backlogs` 도구를 한 번만 호출할 것. 검토한 백로그 전체가 저장되며, 결과의 `failed` 항목만 사용자에게 알리고 필요하면 다시 `save_backlogs`를 호출할 것 (이미 저장된 항목은 건너뜀)
 
   ## Workflow for Backlog Status Queries
   1. 사용자가 요청한 백로그를 정확히 파악할 것 (여러 프로젝트에 걸쳐 있을 수 있거나 단일 프로젝트 내에 있을 수 있음)
@@ -50,4 +51,6 @@ prompt="""
   ## Output Format
   When presenting created backlogs, format them clearly for user review before saving.
   Provide structured backlog information with proper hierarchy and dependencies.
+  수정 요청으로 백로그를 삭제했다면 삭제한 백로그의 title을 `deleted`에 넣을 것. 삭제가 없으면 빈 리스트로 둘 것.
+  `project_id`에는 출력한 백로그가 속한 프로젝트 ID를 넣을 것. 서버에서 조회한 백로그는 서버의 `id`를 그대로 넣고, 새로 생성한 백로그는 `id`를 null로 둘 것.
 """
\ No newline at end of file
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+from langchain_core.tools import ToolException
+from langgraph.graph.state import RunnableConfig
+
+from metrics import counter
+from .mcp_utils import call_mcp_tool, mcp_tool_schema
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 한 번에 저장하는 항목 수. 서버에 일괄 생성 툴이 있으면 요청 하나, 없으면 동시에 보내는 개별 호출 수.
+BULK_SAVE_CHUNK_SIZE = int(os.getenv("BULK_SAVE_CHUNK_SIZE", "10"))
+
+# 워커 노드가 상태의 백로그/스프린트를 툴에 넘겨주는 config["configurable"] 키
+STRUCTURED_CONFIG_KEY = "structured_items"
+
+BULK_SAVE_ITEMS = counter(
+    "zenior_bulk_save_items_total",
+    "Items handled by bulk save tools by channel and outcome (saved, skipped, failed).",
+)
+
+class SaveTarget(NamedTuple):
+    channel: str
+    list_tool: str
+    create_tool: str
+    bulk_tool: str
+    # 이미 저장된 항목인지 비교하는 필드
+    key_field: str
+
+BACKLOG_TARGET = SaveTarget("backlogs", "get_backlogs", "create_backlog", "create_backlogs", "title")
+SPRINT_TARGET = SaveTarget("sprints", "get_sprints", "create_sprint", "create_sprints", "sprint_number")
+
+def _parse_items(content: Any) -> List[dict]:
+    if isinstance(content, list):
+        content = content[0] if len(content) == 1 else "[" + ",".join(content) + "]"
+
+    try:
+        value = json.loads(content) if isinstance(content, str) else content
+    except ValueError:
+        return []
+
+    if isinstance(value, dict):
+        # {"items": [...]} 처럼 감싸서 돌려주는 서버도 처리한다.
+        value = next((field for field in value.values() if isinstance(field, list)), [])
+
+    return [item for item in value or [] if isinstance(item, dict)]
+
+def _arguments(schema: Optional[Dict[str, Any]], project_id: str, item: dict) -> Dict[str, Any]:
+    """항목에서 툴 스키마에 있는 필드만 골라 인자로 만든다."""
+    properties = (schema or {}).get("properties") or {}
+    arguments = {
+        field: value for field, value in item.items()
+        if value is not None and (not properties or field in properties)
+    }
+    arguments["project_id"] = project_id
+
+    return arguments
+
+async def _existing_keys(target: SaveTarget, project_id: str, config: RunnableConfig) -> set:
+    # 중복 생성 여부를 가르는 조회이므로 최대 MCP_TOOL_CACHE_TTL 만큼 오래된 캐시 결과는 쓰지 않는다.
+    content, _ = await call_mcp_tool(target.list_tool, {"project_id": project_id}, config, fresh=True)
+
+    return {str(item.get(target.key_field)) for item in _parse_items(content)}
+
+async def _save_chunk(target: SaveTarget, project_id: str, chunk: List[dict], config: RunnableConfig) -> List[Optional[str]]:
+    """항목별 오류 메시지 목록을 반환한다. 성공한 항목은 None."""
+    bulk_schema = mcp_tool_schema(target.bulk_tool)
+
+    if bulk_schema is not None:
+        try:
+            await call_mcp_tool(target.bulk_tool, {
+                "project_id": project_id,
+                target.channel: [
+                    {field: value for field, value in item.items() if value is not None and field != "project_id"}
+                    for item in chunk
+                ],
+            }, config)
+        except Exception as e:
+            return [str(e)] * len(chunk)
+
+        return [None] * len(chunk)
+
+    create_schema = mcp_tool_schema(target.create_tool)
+    results = await asyncio.gather(*(
+        call_mcp_tool(target.create_tool, _arguments(create_schema, project_id, item), config)
+        for item in chunk
+    ), return_exceptions=True)
+
+    return [str(result) if isinstance(result, BaseException) else None for result in results]
+
+async def bulk_save(target: SaveTarget, project_id: str, config: RunnableConfig) -> str:
+    """
+        상태에 저장된 항목을 LLM 툴 호출 반복 없이 한 번에 저장한다.
+        project_id 프로젝트용으로 이 대화에서 생성한 항목(서버 id 가 없는 항목)만 저장하며,
+        다른 프로젝트에서 조회하거나 생성한 항목은 건드리지 않는다.
+        서버에 이미 있는 항목(key_field 가 같은 항목)은 건너뛰므로 다시 호출해도 중복 생성되지 않는다.
+        청크 하나가 실패해도 나머지는 계속 저장하고, 결과에 실패한 항목과 오류를 담아 반환한다.
+    """
+    items = [
+        item for item in (config.get("configurable", {}).get(STRUCTURED_CONFIG_KEY) or {}).get(target.channel) or []
+        if item.get("project_id") == project_id and not item.get("id")
+    ]
+
+    if not items:
+        raise ToolException(
+            f"프로젝트 {project_id} 에 저장할 {target.channel} 항목이 없습니다. "
+            "먼저 이 프로젝트의 항목을 생성해 사용자 검토를 받으세요."
+        )
+
+    existing = await _existing_keys(target, project_id, config)
+    pending = [item for item in items if str(item.get(target.key_field)) not in existing]
+    report = {
+        "project_id": project_id,
+        "saved": [],
+        "skipped": [item.get(target.key_field) for item in items if str(item.get(target.key_field)) in existing],
+        "failed": [],
+    }
+
+    for start in range(0, len(pending), BULK_SAVE_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_SAVE_CHUNK_SIZE]
+        errors = await _save_chunk(target, project_id, chunk, config)
+
+        for item, error in zip(chunk, errors):
+            if error is None:
+                report["saved"].append(item.get(target.key_field))
+            else:
+                report["failed"].append({target.key_field: item.get(target.key_field), "error": error})
+
+    for outcome in ("saved", "skipped", "failed"):
+        if report[outcome]:
+            BULK_SAVE_ITEMS.inc(len(report[outcome]), channel=target.channel, outcome=outcome)
+
+    return json.dumps(report, ensure_ascii=False)
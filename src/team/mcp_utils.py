@@ -1,42 +1,538 @@
+import asyncio
+import hashlib
+import json
 import os
-from typing import List, Any, Dict
-from langchain_mcp_adapters.client import MultiServerMCPClient
+import re
+import time
+from collections import OrderedDict
+from typing import List, Any, Dict, Optional
+import httpx
+from mcp import ClientSession
+from langchain_core.tools import StructuredTool, ToolException
+from langchain_mcp_adapters.sessions import create_session
 from langgraph.graph.state import RunnableConfig
+from mcp.types import CallToolResult, TextContent, Tool as MCPTool
 from dotenv import load_dotenv
 import traceback
 
+from metrics import span
+
 load_dotenv()
 
-async def setup_mcp_tools(config: RunnableConfig) -> List[Any]:
+# 툴 스키마 캐시 유지 시간(초). 만료되면 다음 호출에서 다시 조회한다.
+MCP_TOOLS_TTL = float(os.getenv("ZENIOR_MCP_TOOLS_TTL", "300"))
+# 스키마 재조회가 실패했을 때 기존 캐시를 계속 쓰면서 재시도를 미루는 시간(초).
+MCP_TOOLS_RETRY_DELAY = 30.0
+MCP_MAX_CONNECTIONS = int(os.getenv("ZENIOR_MCP_MAX_CONNECTIONS", "100"))
+MCP_KEEPALIVE_EXPIRY = float(os.getenv("ZENIOR_MCP_KEEPALIVE_EXPIRY", "60"))
+# 토큰별로 초기화된 MCP 세션을 재사용한다. 유휴 시간이 지나거나 풀이 가득 차면 닫는다.
+MCP_SESSION_POOL_SIZE = int(os.getenv("ZENIOR_MCP_SESSION_POOL_SIZE", "64"))
+MCP_SESSION_IDLE_TIMEOUT = float(os.getenv("ZENIOR_MCP_SESSION_IDLE_TIMEOUT", "300"))
+# 읽기 툴 결과 캐시. 같은 사용자/프로젝트에 대한 같은 호출은 TTL(초) 동안 재사용한다. 0 이면 사용 안 함.
+MCP_TOOL_CACHE_TTL = float(os.getenv("ZENIOR_MCP_TOOL_CACHE_TTL", "30"))
+MCP_TOOL_CACHE_SIZE = int(os.getenv("ZENIOR_MCP_TOOL_CACHE_SIZE", "512"))
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+        MCP 세션마다 만들어지는 httpx 클라이언트가 닫혀도
+        커넥션 풀은 닫히지 않도록 감싼 트랜스포트.
+    """
+    def __init__(self):
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=_HTTP2,
+            limits=httpx.Limits(
+                max_connections=MCP_MAX_CONNECTIONS,
+                max_keepalive_connections=MCP_MAX_CONNECTIONS,
+                keepalive_expiry=MCP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+    async def close_pool(self) -> None:
+        await self._transport.aclose()
+
+_transport: Optional[_SharedTransport] = None
+
+# 툴 스키마는 토큰과 무관하므로 프로세스 단위로 캐시해서 모든 사용자가 공유한다.
+# 실제 호출 시점에 config["configurable"]["token"] 으로 사용자 토큰을 붙인다.
+_mcp_tools: Optional[List[StructuredTool]] = None
+_mcp_tools_fingerprint: Optional[str] = None
+_mcp_tools_expires_at = 0.0
+_mcp_tools_task: Optional[asyncio.Task] = None
+
+# 이름만으로 서버 상태를 바꾸는 툴인지 판별한다. (create_backlog, update_sprint, save_... 등)
+_MUTATING_TOOL_PATTERN = re.compile(
+    r"(^|_)(create|update|save|delete|remove|add|set|assign|move|patch|upsert)(_|$)"
+)
+
+def is_mutating_tool(name: str) -> bool:
+    return bool(_MUTATING_TOOL_PATTERN.search(name.lower()))
+
+class BearerToken:
+    """
+        config["configurable"]["token"] 에 넣는 사용자 토큰.
+        configurable 의 str 값은 체크포인트 메타데이터(와 트레이스 메타데이터)에 그대로 복사되므로
+        str 이 아닌 객체로 감싸 토큰이 저장소에 남지 않게 한다.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return "BearerToken(***)"
+
+def get_token(config: Optional[RunnableConfig]) -> Optional[str]:
     token = config.get("configurable", {}).get("token") if config else None
-    
+
+    return token.value if isinstance(token, BearerToken) else token
+
+def _http_client_factory(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    global _transport
+
+    if _transport is None:
+        _transport = _SharedTransport()
+
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30, read=300),
+        auth=auth,
+        follow_redirects=True,
+        transport=_transport,
+    )
+
+def _connection(mcp_url: str, token: str) -> Dict[str, Any]:
+    return {
+        "transport": "streamable_http",
+        "url": mcp_url,
+        "headers": {
+            "Authorization": f"Bearer {token}"
+        },
+        "httpx_client_factory": _http_client_factory,
+    }
+
+class _PooledSession:
+    """
+        초기화된 MCP 세션 하나를 소유하는 백그라운드 태스크.
+        세션의 열기/닫기는 항상 같은 태스크에서 일어나야 하므로
+        호출하는 쪽은 session 객체만 빌려 쓴다.
+    """
+    def __init__(self, connection: Dict[str, Any]):
+        self._connection = connection
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._session: Optional[ClientSession] = None
+        self._error: Optional[BaseException] = None
+        self.last_used = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            async with create_session(self._connection) as session:
+                await session.initialize()
+                self._session = session
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return not self._task.done()
+
+    async def get(self) -> ClientSession:
+        await self._ready.wait()
+
+        if self._session is None:
+            raise self._error or RuntimeError("MCP session is closed")
+
+        self.last_used = time.monotonic()
+
+        return self._session
+
+    async def aclose(self):
+        self._closing.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+_sessions: "OrderedDict[str, _PooledSession]" = OrderedDict()
+_closing_sessions = set()
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _close_in_background(pooled: _PooledSession):
+    task = asyncio.create_task(pooled.aclose())
+    _closing_sessions.add(task)
+    task.add_done_callback(_closing_sessions.discard)
+
+def _discard_session(token: str, pooled: _PooledSession):
+    key = _token_key(token)
+
+    if _sessions.get(key) is pooled:
+        del _sessions[key]
+
+    _close_in_background(pooled)
+
+def _acquire_session(mcp_url: str, token: str) -> _PooledSession:
+    key = _token_key(token)
+    pooled = _sessions.get(key)
+
+    if pooled is not None and (
+        not pooled.alive or time.monotonic() - pooled.last_used > MCP_SESSION_IDLE_TIMEOUT
+    ):
+        _discard_session(token, pooled)
+        pooled = None
+
+    if pooled is None:
+        pooled = _PooledSession(_connection(mcp_url, token))
+        _sessions[key] = pooled
+
+        while len(_sessions) > MCP_SESSION_POOL_SIZE:
+            _, oldest = _sessions.popitem(last=False)
+            _close_in_background(oldest)
+
+    _sessions.move_to_end(key)
+
+    return pooled
+
+async def close_mcp_pool():
+    """프로세스 종료 시 MCP 세션과 keep-alive 커넥션을 정리한다."""
+    global _transport
+
+    sessions = list(_sessions.values())
+    _sessions.clear()
+
+    await asyncio.gather(
+        *(pooled.aclose() for pooled in sessions),
+        *_closing_sessions,
+        return_exceptions=True,
+    )
+
+    if _transport is not None:
+        await _transport.close_pool()
+        _transport = None
+
+def _convert_result(result: CallToolResult):
+    text_parts = [
+        content.text for content in result.content
+        if isinstance(content, TextContent)
+    ]
+    text = text_parts[0] if len(text_parts) == 1 else text_parts
+
+    if result.isError:
+        raise ToolException(text)
+
+    return text, getattr(result, "structuredContent", None)
+
+async def _pooled_session(mcp_url: str, token: str) -> ClientSession:
+    pooled = _acquire_session(mcp_url, token)
+
+    try:
+        return await pooled.get()
+    except Exception:
+        # 세션 연결에 실패했다면 요청은 아직 보내지 않았으므로 새 세션으로 한 번 더 시도한다.
+        _discard_session(token, pooled)
+
+        return await _acquire_session(mcp_url, token).get()
+
+async def _call_mcp_tool(name: str, arguments: Dict[str, Any], token: str):
+    mcp_url = os.getenv("ZENIOR_MCP_SERVER_URL")
+
+    with span("mcp_tool", name=name):
+        session = await _pooled_session(mcp_url, token)
+
+        try:
+            result = await session.call_tool(name, arguments)
+        except Exception:
+            # 서버에서 세션이 만료되었을 수 있으므로 다음 호출은 새 세션을 쓰게 한다.
+            # 쓰기 툴이 중복 실행될 수 있어 여기서 재시도하지는 않는다.
+            pooled = _sessions.get(_token_key(token))
+            if pooled is not None:
+                _discard_session(token, pooled)
+            raise
+
+    return _convert_result(result)
+
+_PROJECT_ID_KEYS = ("project_id", "projectId")
+
+def _project_id(arguments: Dict[str, Any]) -> Optional[str]:
+    for key in _PROJECT_ID_KEYS:
+        if arguments.get(key) is not None:
+            return str(arguments[key])
+
+    return None
+
+class ToolResultCache:
+    """
+        읽기 툴 결과를 (토큰, 프로젝트 ID, 툴 이름, 인자) 로 보관하는 LRU + TTL 캐시.
+        쓰기 툴이 호출되면 해당 프로젝트의 항목을 비운다.
+    """
+    def __init__(self, ttl: float = MCP_TOOL_CACHE_TTL, max_size: int = MCP_TOOL_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        # 조회 도중 쓰기가 일어나면 이전 결과를 저장하지 않도록 범위별 세대 번호를 둔다.
+        self._generations: Dict[tuple, int] = {}
+        self._epoch = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @staticmethod
+    def key(token: str, name: str, arguments: Dict[str, Any]) -> tuple:
+        canonical = json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)
+
+        return _token_key(token), _project_id(arguments), name, canonical
+
+    def generation(self, key: tuple) -> tuple:
+        token_key, project_id = key[:2]
+
+        return (
+            self._epoch,
+            self._generations.get((token_key, None), 0),
+            self._generations.get((token_key, project_id), 0),
+        )
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+        if entry is not None:
+            del self._entries[key]
+
+        self.misses += 1
+
+        return None
+
+    def put(self, key: tuple, result, generation: tuple):
+        if generation != self.generation(key):
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str, project_id: Optional[str]):
+        """
+            프로젝트 ID 가 있으면 그 프로젝트와 프로젝트 ID 없이 조회한 항목(목록 등)을 비우고,
+            없으면 어떤 프로젝트가 바뀌었는지 알 수 없으므로 해당 사용자의 항목을 모두 비운다.
+        """
+        token_key = _token_key(token)
+
+        if len(self._generations) > self.max_size * 4:
+            self._generations.clear()
+            self._epoch += 1
+
+        self._generations[(token_key, project_id)] = self._generations.get((token_key, project_id), 0) + 1
+
+        if project_id is not None:
+            self._generations[(token_key, None)] = self._generations.get((token_key, None), 0) + 1
+
+        stale = [
+            key for key in self._entries
+            if key[0] == token_key and (project_id is None or key[1] in (project_id, None))
+        ]
+
+        for key in stale:
+            del self._entries[key]
+
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+        }
+
+tool_cache = ToolResultCache()
+
+def get_mcp_tool_cache_stats() -> Dict[str, int]:
+    return tool_cache.stats()
+
+async def _call_mcp_tool_cached(name: str, arguments: Dict[str, Any], token: str, fresh: bool = False):
+    if not tool_cache.enabled:
+        return await _call_mcp_tool(name, arguments, token)
+
+    if is_mutating_tool(name):
+        try:
+            return await _call_mcp_tool(name, arguments, token)
+        finally:
+            # 실패했더라도 서버에 일부 반영되었을 수 있으므로 항상 비운다.
+            tool_cache.invalidate(token, _project_id(arguments))
+
+    key = tool_cache.key(token, name, arguments)
+    # fresh 면 캐시된 결과를 쓰지 않고 서버에서 다시 읽어 캐시를 갱신한다.
+    cached = tool_cache.get(key) if not fresh else None
+
+    if cached is not None:
+        return cached
+
+    generation = tool_cache.generation(key)
+    result = await _call_mcp_tool(name, arguments, token)
+    tool_cache.put(key, result, generation)
+
+    return result
+
+async def call_mcp_tool(name: str, arguments: Dict[str, Any], config: RunnableConfig, fresh: bool = False):
+    """
+        실행 중인 config 의 사용자 토큰으로 MCP 툴을 호출한다. (content, artifact) 를 반환한다.
+        fresh 면 읽기 툴 결과 캐시를 건너뛴다.
+    """
+    token = get_token(config)
+
+    if not token:
+        raise ToolException("Token not provided in config. Cannot call MCP tool.")
+
+    speculation = config.get("configurable", {}).get("speculation")
+
+    if speculation is not None and is_mutating_tool(name):
+        # 추측 실행 중에는 Supervisor 가 이 워커를 실제로 고를 때까지 데이터를 바꾸지 않는다.
+        await speculation.wait_for_commit()
+
+    return await _call_mcp_tool_cached(name, arguments, token, fresh)
+
+def _wrap_mcp_tool(mcp_tool: MCPTool) -> StructuredTool:
+    """
+        MCP 툴을 토큰에 독립적인 LangChain 툴로 감싼다.
+        토큰은 실행 시점의 RunnableConfig 에서 읽는다.
+    """
+    async def call_tool(config: RunnableConfig, **arguments):
+        return await call_mcp_tool(mcp_tool.name, arguments, config)
+
+    return StructuredTool(
+        name=mcp_tool.name,
+        description=mcp_tool.description or "",
+        args_schema=mcp_tool.inputSchema,
+        coroutine=call_tool,
+        response_format="content_and_artifact",
+    )
+
+async def _list_mcp_tools(mcp_url: str, token: str) -> List[MCPTool]:
+    tools = []
+    cursor = None
+    session = await _pooled_session(mcp_url, token)
+
+    while True:
+        page = await session.list_tools(cursor=cursor)
+        tools.extend(page.tools)
+
+        if not page.nextCursor:
+            break
+
+        cursor = page.nextCursor
+
+    return tools
+
+def _fingerprint(mcp_tools: List[MCPTool]) -> str:
+    schemas = sorted(
+        (tool.name, tool.description or "", tool.inputSchema) for tool in mcp_tools
+    )
+    return hashlib.sha256(
+        json.dumps(schemas, sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+def mcp_enabled() -> bool:
+    return bool(os.getenv("ZENIOR_MCP_SERVER_URL"))
+
+def mcp_tools_ready() -> bool:
+    """MCP 툴 로드가 끝났거나 MCP 서버가 설정되지 않아 로드할 것이 없으면 True."""
+    return _mcp_tools is not None or not mcp_enabled()
+
+def mcp_tools_fresh() -> bool:
+    return _mcp_tools is not None and time.monotonic() < _mcp_tools_expires_at
+
+def mcp_tools_fingerprint() -> Optional[str]:
+    """현재 캐시된 툴 스키마의 해시. 스키마가 바뀌면 값이 달라진다."""
+    return _mcp_tools_fingerprint
+
+def mcp_tool_schema(name: str) -> Optional[Dict[str, Any]]:
+    """불러온 MCP 툴 중 name 의 입력 스키마. 서버에 없는 툴이면 None."""
+    for mcp_tool in _mcp_tools or []:
+        if mcp_tool.name == name:
+            return mcp_tool.args_schema
+
+    return None
+
+def invalidate_mcp_tools():
+    """툴 스키마 캐시를 만료시켜 다음 호출에서 다시 조회하게 한다."""
+    global _mcp_tools_expires_at
+    _mcp_tools_expires_at = 0.0
+
+async def setup_mcp_tools(config: RunnableConfig) -> List[Any]:
+    global _mcp_tools_task
+
+    if mcp_tools_fresh():
+        return _mcp_tools
+
+    # 동시에 들어온 요청들이 스키마 조회를 한 번만 하도록 하나의 태스크를 공유한다.
+    # 호출한 쪽이 타임아웃으로 취소되어도 조회 자체는 끝까지 진행된다.
+    if _mcp_tools_task is None or _mcp_tools_task.done():
+        _mcp_tools_task = asyncio.create_task(_load_mcp_tools(config))
+
+    return await asyncio.shield(_mcp_tools_task)
+
+async def _load_mcp_tools(config: RunnableConfig) -> List[Any]:
+    global _mcp_tools, _mcp_tools_fingerprint, _mcp_tools_expires_at
+
+    token = get_token(config)
+
     if not token:
         print("⚠️  Warning: Token not provided in config. Running without MCP tools.")
 
-        return []
-    
+        return _mcp_tools or []
+
     mcp_url = os.getenv("ZENIOR_MCP_SERVER_URL")
 
     if not mcp_url:
         print("⚠️  Warning: ZENIOR_MCP_SERVER_URL environment variable is not set. Running without MCP tools.")
 
         return []
-    
+
     try:
-        client = MultiServerMCPClient({
-            "zenior": {
-                "transport": "streamable_http",
-                "url": mcp_url,
-                "headers": {
-                    "Authorization": f"Bearer {token}"
-                }
-            }
-        })
-
-        mcp_tools = await client.get_tools()
-        print(f"✓ Successfully loaded {len(mcp_tools)} MCP tools")
-
-        return mcp_tools
+        with span("mcp_discovery"):
+            definitions = await _list_mcp_tools(mcp_url, token)
+        fingerprint = _fingerprint(definitions)
+
+        if fingerprint != _mcp_tools_fingerprint:
+            # 서버가 돌려주는 순서와 무관하게 툴 스키마가 항상 같은 순서로 프롬프트에 들어가도록 정렬한다.
+            _mcp_tools = [_wrap_mcp_tool(tool) for tool in sorted(definitions, key=lambda tool: tool.name)]
+            _mcp_tools_fingerprint = fingerprint
+            print(f"✓ Successfully loaded {len(_mcp_tools)} MCP tools")
+
+        _mcp_tools_expires_at = time.monotonic() + MCP_TOOLS_TTL
+
+        return _mcp_tools
     except Exception as e:
         print(f"⚠️  Warning: MCP setup failed: {e}")
         print(f"   MCP URL was: {mcp_url}")
@@ -44,4 +540,10 @@ async def setup_mcp_tools(config: RunnableConfig) -> List[Any]:
 
         traceback.print_exc()
 
+        if _mcp_tools is not None:
+            # 이전에 불러온 스키마가 있으면 그대로 쓰고 잠시 후 다시 시도한다.
+            _mcp_tools_expires_at = time.monotonic() + MCP_TOOLS_RETRY_DELAY
+
+            return _mcp_tools
+
         return []
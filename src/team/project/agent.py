@@ -1,5 +1,5 @@
+from typing import Any, List, Optional
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langgraph.graph.state import RunnableConfig
 from langchain.agents import create_agent
 from langgraph.types import interrupt
@@ -7,6 +7,7 @@ from langgraph.types import interrupt
 from ..hand_off_agent import create_interactive_agent
 from .prompt import prompt
 from ..mcp_utils import setup_mcp_tools
+from llm import get_chat_model
 
 @tool
 def request_workspace_selection() -> dict:
@@ -29,19 +30,11 @@ def request_project_selection() -> dict:
 
     return project_id
 
-async def create_project_agent(config: RunnableConfig):
-    # 타임아웃 및 재시도 설정 추가
-    llm = ChatOpenAI(
-        model="gpt-4o", 
-        use_responses_api=True,
-        timeout=120,  # 120초 타임아웃
-        max_retries=3,  # 최대 3번 재시도
-        request_timeout=120,  # 요청 타임아웃 120초
-        name="ProjectAgent",
-    )
+async def create_project_agent(config: RunnableConfig, mcp_tools: Optional[List[Any]] = None):
     tools = [request_workspace_selection, request_project_selection]
 
-    mcp_tools = await setup_mcp_tools(config)
+    if mcp_tools is None:
+        mcp_tools = await setup_mcp_tools(config)
 
     # agent = await create_interactive_agent(
     #     model=llm,
@@ -51,7 +44,7 @@ async def create_project_agent(config: RunnableConfig):
     # )
 
     agent = create_agent(
-        model="gpt-4o",
+        model=get_chat_model(),
         tools=[*tools, *mcp_tools],
         system_prompt=prompt,
     )
@@ -1,14 +1,16 @@
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
 from langchain.agents import create_agent
 from langchain.tools import tool
-from langchain_openai import ChatOpenAI
 from langgraph.graph.state import RunnableConfig
 from langgraph.types import interrupt
 from pydantic import BaseModel, Field
 
 from ..hand_off_agent import create_interactive_agent
 from ..mcp_utils import setup_mcp_tools
+from ..bulk_save import SPRINT_TARGET, bulk_save
+from ..structured_output import JsonStructuredResponse
+from llm import get_chat_model
 from .prompt import prompt
 
 class SprintStatus(str, Enum):
@@ -21,6 +23,7 @@ class Sprint(BaseModel):
   """
     Schema for Sprint entity, matching the Service (Core) Schema.
   """
+  id: Optional[str] = Field(default=None, description="Server ID when the sprint was read from the server. null for newly generated sprints")
   name: str = Field(description="Name of the sprint")
   sprint_number: int = Field(description="Sprint number")
   goal: Optional[str] = Field(description="Sprint goal")
@@ -30,27 +33,33 @@ class Sprint(BaseModel):
   backlog_ids: Optional[List[str]] = Field(default=None, description="List of backlog IDs or titles included in the sprint")
 
 class SprintOutput(BaseModel):
+    project_id: Optional[str] = Field(description="ID of the project this sprint belongs to. null if no project is selected yet.")
     sprints: Sprint
+    deleted: List[str] = Field(description="Sprint numbers removed in this revision. Empty list if none.")
 
-async def create_sprint_agent(config: RunnableConfig):
-    llm = ChatOpenAI(
-        model="gpt-4o", 
-        use_responses_api=True,
-        timeout=120,
-        max_retries=3,
-        request_timeout=120,
-        name="SprintAgent",
-    )
+@tool
+async def save_sprints(project_id: str, config: RunnableConfig) -> str:
+    """
+    Save all sprints currently under review to the project in one call.
+    Use this tool instead of calling create tools one by one when the supervisor asks to save after user confirmation.
+    Items that already exist in the project are skipped, and the result lists saved, skipped and failed items.
+    """
+    return await bulk_save(SPRINT_TARGET, project_id, config)
+
+async def create_sprint_agent(config: RunnableConfig, mcp_tools: Optional[List[Any]] = None):
 
-    tools = []
+    if mcp_tools is None:
+        mcp_tools = await setup_mcp_tools(config)
 
-    mcp_tools = await setup_mcp_tools(config)
+    # 일괄 저장은 MCP 툴을 쓰므로 MCP 툴이 있을 때만 준다.
+    tools = [save_sprints] if mcp_tools else []
 
     agent = create_agent(
-        model="gpt-4o",
+        model=get_chat_model(),
         system_prompt=prompt,
         tools=[*tools, *mcp_tools],
         response_format=SprintOutput,
+        middleware=[JsonStructuredResponse()],
     )
 
     return agent
\ No newline at end of file
@@ -28,6 +28,7 @@ You are the SprintAgent, responsible for sprint planning and management in an ag
 3. Present the sprint details to the supervisor for user review
 4. Wait for supervisor confirmation before saving
 5. Only save when explicitly requested by the supervisor
+6. 저장할 때는 `create_sprint`를 스프린트마다 호출하지 말고 `save_sprints` 도구를 한 번만 호출할 것. 결과의 `failed` 항목만 사용자에게 알리고 필요하면 다시 `save_sprints`를 호출할 것 (이미 저장된 스프린트는 건너뜀)
 
 ## Workflow for Sprint Optimization
 1. When supervisor requests optimization, review existing backlogs and sprints
@@ -60,4 +61,6 @@ You are the SprintAgent, responsible for sprint planning and management in an ag
 ## Output Format
 Return a structured SprintOutput containing Sprint details with goals, assigned backlogs, and timeline.
 When presenting created sprints, format them clearly for user review before saving.
+수정 요청으로 스프린트를 삭제했다면 삭제한 스프린트 번호를 `deleted`에 넣을 것. 삭제가 없으면 빈 리스트로 둘 것.
+`project_id`에는 출력한 스프린트가 속한 프로젝트 ID를 넣을 것. 서버에서 조회한 스프린트는 서버의 `id`를 그대로 넣고, 새로 생성한 스프린트는 `id`를 null로 둘 것.
 """
\ No newline at end of file
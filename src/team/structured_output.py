@@ -0,0 +1,32 @@
+from typing import Any, Awaitable, Callable
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from pydantic import BaseModel
+
+def _dump_response(response: Any) -> Any:
+    if isinstance(response, ModelResponse) and isinstance(response.structured_response, BaseModel):
+        return ModelResponse(
+            result=response.result,
+            structured_response=response.structured_response.model_dump(mode="json"),
+        )
+
+    return response
+
+class JsonStructuredResponse(AgentMiddleware):
+    """
+        response_format 으로 파싱된 pydantic 출력(BacklogOutput 등)을 JSON dict 로 바꿔 상태에 넣는다.
+        워커 서브그래프의 체크포인트에 애플리케이션 타입이 남지 않으므로
+        체크포인터 직렬화 allowlist(LANGGRAPH_STRICT_MSGPACK 등)와 관계없이 스레드를 다시 읽을 수 있다.
+    """
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        return _dump_response(handler(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        return _dump_response(await handler(request))
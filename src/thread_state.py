@@ -0,0 +1,134 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from graph import get_checkpointer
+
+load_dotenv()
+
+# 스레드별로 서버가 들고 있는 프론트엔드 상태(assistant-stream state) 캐시 크기와 유지 시간(초)
+THREAD_STATE_CACHE_SIZE = int(os.getenv("THREAD_STATE_CACHE_SIZE", "1000"))
+THREAD_STATE_TTL = float(os.getenv("THREAD_STATE_TTL", "3600"))
+
+VERSION_KEY = "stateVersion"
+
+class ThreadStateStore:
+    """
+        threadId 로 마지막 실행이 끝난 시점의 상태와 버전, 스레드 소유자(sub)를 보관한다.
+        클라이언트가 같은 버전을 보내면 상태를 다시 받지 않고 서버 사본에서 이어서 실행하고,
+        변경분만 스트리밍한다. 소유자가 아닌 사용자의 요청은 거부한다.
+    """
+    def __init__(self, max_size: int = THREAD_STATE_CACHE_SIZE, ttl: float = THREAD_STATE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any], Optional[str]]]" = OrderedDict()
+
+    def get(self, thread_id: str) -> Optional[Tuple[int, Dict[str, Any], Optional[str]]]:
+        entry = self._entries.get(thread_id)
+
+        if entry is None:
+            return None
+
+        stored_at, version, state, owner = entry
+
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[thread_id]
+
+            return None
+
+        self._entries.move_to_end(thread_id)
+
+        return version, state, owner
+
+    def put(self, thread_id: str, version: int, state: Dict[str, Any], owner: Optional[str]):
+        if self.max_size <= 0:
+            return
+
+        self._entries[thread_id] = (time.monotonic(), version, state, owner)
+        self._entries.move_to_end(thread_id)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, thread_id: Optional[str]):
+        """서버 사본을 버린다. 다음 요청은 체크포인트에서 다시 만든 전체 상태를 받는다."""
+        if thread_id:
+            self._entries.pop(thread_id, None)
+
+    def _rebuild(self, checkpoint_tuple: Any) -> Dict[str, Any]:
+        """캐시에 없으면 체크포인트에 남은 메시지로 상태를 다시 만든다."""
+        if checkpoint_tuple is None:
+            return {"messages": []}
+
+        messages = checkpoint_tuple.checkpoint["channel_values"].get("messages", [])
+
+        return {"messages": [message.model_dump() for message in messages]}
+
+    async def resolve(
+        self,
+        thread_id: Optional[str],
+        user_id: Optional[str],
+        client_version: Optional[int],
+        client_state: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], int, bool]:
+        """
+            이번 실행의 시작 상태를 정한다.
+            (상태, 버전, 클라이언트에 전체 상태를 다시 보내야 하는지) 를 반환한다.
+            이미 있는 스레드의 소유자가 user_id 가 아니면 PermissionError 를 던진다.
+        """
+        cached = self.get(thread_id) if thread_id else None
+        checkpoint_tuple = None
+
+        if cached is not None:
+            owner = cached[2]
+        else:
+            # 체크포인트 메타데이터에는 실행 config 의 user_id 가 함께 저장된다.
+            checkpoint_tuple = (
+                await get_checkpointer().aget_tuple({"configurable": {"thread_id": thread_id}})
+                if thread_id else None
+            )
+            owner = checkpoint_tuple.metadata.get("user_id") if checkpoint_tuple is not None else user_id
+
+        if owner != user_id:
+            raise PermissionError(f"Thread {thread_id} does not belong to the caller")
+
+        if cached is not None and client_version is not None and cached[0] == client_version:
+            self.hits += 1
+
+            return cached[1], cached[0], False
+
+        self.misses += 1
+
+        # 예전 클라이언트처럼 상태를 함께 보냈다면 그대로 쓴다.
+        if client_state is not None:
+            version = cached[0] if cached is not None else 0
+
+            return client_state, version, False
+
+        if cached is not None:
+            return cached[1], cached[0], True
+
+        state = self._rebuild(checkpoint_tuple)
+
+        return state, 0, True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+thread_states = ThreadStateStore()
+
+def final_state(state: Any) -> Optional[Dict[str, Any]]:
+    """실행이 끝난 controller.state 를 캐시에 넣을 dict 로 꺼낸다. 프록시의 items() 는 원본 값을 그대로 돌려준다."""
+    if state is None:
+        return None
+
+    return dict(state.items())
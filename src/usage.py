@@ -0,0 +1,298 @@
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from dotenv import load_dotenv
+
+from metrics import counter
+
+load_dotenv()
+
+# 사용자별 하루(UTC) 토큰 한도와 요청(턴) 하나의 토큰 한도. 0 이면 제한하지 않는다.
+USAGE_USER_DAILY_TOKEN_BUDGET = int(os.getenv("USAGE_USER_DAILY_TOKEN_BUDGET", "0"))
+USAGE_TURN_TOKEN_BUDGET = int(os.getenv("USAGE_TURN_TOKEN_BUDGET", "0"))
+# 사용량을 보관하는 최대 스레드 수 (오래 쓰지 않은 스레드부터 버린다)
+USAGE_MAX_THREADS = int(os.getenv("USAGE_MAX_THREADS", "1000"))
+# 모델별 100만 토큰당 가격(USD): "모델=입력/출력/캐시입력" 을 쉼표로 구분
+USAGE_PRICING = os.getenv("USAGE_PRICING", "gpt-4o=2.5/10/1.25,gpt-4o-mini=0.15/0.6/0.075")
+
+LLM_TOKENS = counter("zenior_llm_tokens_total", "LLM tokens by graph node, model and token type.")
+LLM_CALLS = counter("zenior_llm_calls_total", "LLM calls by graph node and model.")
+LLM_COST = counter("zenior_llm_cost_usd_total", "Estimated LLM cost in USD by graph node and model.")
+BUDGET_STOPS = counter("zenior_usage_budget_stops_total", "Runs stopped because a token budget was exhausted.")
+
+def parse_pricing(value: str) -> Dict[str, Tuple[float, float, float]]:
+    pricing = {}
+
+    for entry in value.split(","):
+        if "=" not in entry:
+            continue
+
+        model, prices = entry.split("=", 1)
+
+        try:
+            input_price, output_price, *cached = [float(price) for price in prices.split("/")]
+        except ValueError:
+            print(f"⚠️  Warning: Invalid USAGE_PRICING entry: {entry.strip()}")
+            continue
+
+        pricing[model.strip()] = (input_price, output_price, cached[0] if cached else input_price)
+
+    return pricing
+
+PRICING = parse_pricing(USAGE_PRICING)
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int) -> float:
+    # gpt-4o-2024-08-06 처럼 날짜가 붙은 이름도 가장 긴 접두어로 찾는다.
+    matches = [name for name in PRICING if model.startswith(name)]
+
+    if not matches:
+        return 0.0
+
+    input_price, output_price, cached_price = PRICING[max(matches, key=len)]
+
+    return (
+        (input_tokens - cache_read_tokens) * input_price
+        + cache_read_tokens * cached_price
+        + output_tokens * output_price
+    ) / 1_000_000
+
+def empty_totals() -> Dict[str, float]:
+    return {
+        "calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "total_tokens": 0,
+        "cost_usd": 0.0,
+    }
+
+def _add(totals: Dict[str, float], usage: Dict[str, float]):
+    for key, value in usage.items():
+        totals[key] += value
+
+def cache_hit_ratio(totals: Dict[str, float]) -> float:
+    """입력 토큰 중 프로바이더 프롬프트 캐시에서 읽은 비율."""
+    return totals["cache_read_tokens"] / totals["input_tokens"] if totals["input_tokens"] else 0.0
+
+class UsageLedger:
+    """
+        스레드 / 에이전트 노드 / 턴(/assistant 요청 한 번) 단위의 LLM 사용량과
+        사용자별 하루 사용량을 메모리에 모아 둔다.
+    """
+    def __init__(self, max_threads: int = USAGE_MAX_THREADS):
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._daily: Dict[Tuple[str, str], int] = {}
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def start_turn(self, thread_id: str, user_id: Optional[str]) -> int:
+        entry = self._threads.get(thread_id)
+
+        if entry is None:
+            entry = {"user_id": user_id, "total": empty_totals(), "by_node": {}, "turns": []}
+            self._threads[thread_id] = entry
+
+        self._threads.move_to_end(thread_id)
+
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+        entry["turns"].append({
+            "turn": len(entry["turns"]) + 1,
+            "user_id": user_id,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "total": empty_totals(),
+            "by_node": {},
+        })
+
+        return len(entry["turns"])
+
+    def record(self, thread_id: str, user_id: Optional[str], node: str, usage: Dict[str, float]):
+        entry = self._threads.get(thread_id)
+
+        if entry is not None:
+            turn = entry["turns"][-1]
+
+            for scope in (entry, turn):
+                _add(scope["total"], usage)
+                _add(scope["by_node"].setdefault(node, empty_totals()), usage)
+
+        if user_id:
+            today = self._today()
+            key = (user_id, today)
+            self._daily[key] = self._daily.get(key, 0) + int(usage["total_tokens"])
+
+            # 지난 날짜의 사용자별 합계는 더 이상 필요 없다.
+            for stale in [k for k in self._daily if k[1] != today]:
+                del self._daily[stale]
+
+    def user_tokens_today(self, user_id: Optional[str]) -> int:
+        if not user_id:
+            return 0
+
+        return self._daily.get((user_id, self._today()), 0)
+
+    def turn_tokens(self, thread_id: Optional[str]) -> int:
+        entry = self._threads.get(thread_id) if thread_id else None
+
+        if entry is None or not entry["turns"]:
+            return 0
+
+        return int(entry["turns"][-1]["total"]["total_tokens"])
+
+    def budget_exceeded(self, thread_id: Optional[str], user_id: Optional[str]) -> Optional[str]:
+        """넘은 한도의 종류("user" / "turn")를 반환한다. 넘지 않았으면 None."""
+        if USAGE_USER_DAILY_TOKEN_BUDGET > 0 and self.user_tokens_today(user_id) >= USAGE_USER_DAILY_TOKEN_BUDGET:
+            return "user"
+
+        if USAGE_TURN_TOKEN_BUDGET > 0 and self.turn_tokens(thread_id) >= USAGE_TURN_TOKEN_BUDGET:
+            return "turn"
+
+        return None
+
+    def log_turn(self, thread_id: Optional[str]):
+        """마지막 턴의 호출 수, 토큰, 프롬프트 캐시 적중률을 한 줄로 출력한다."""
+        entry = self._threads.get(thread_id) if thread_id else None
+
+        if entry is None or not entry["turns"]:
+            return
+
+        turn = entry["turns"][-1]
+        total = turn["total"]
+
+        if not total["calls"]:
+            return
+
+        by_node = ", ".join(
+            f"{node} {cache_hit_ratio(totals):.0%}" for node, totals in turn["by_node"].items()
+        )
+
+        print(
+            f"✓ LLM usage [{thread_id}] turn {turn['turn']}: {total['calls']} calls, "
+            f"input {total['input_tokens']} (cached {total['cache_read_tokens']}, {cache_hit_ratio(total):.0%}), "
+            f"output {total['output_tokens']}, ${total['cost_usd']:.4f} | cache hit: {by_node}"
+        )
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._threads.get(thread_id)
+
+        if entry is None:
+            return None
+
+        return {"thread_id": thread_id, **entry}
+
+    def get_for_user(self, thread_id: str, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+            모든 턴을 user_id 가 실행한 스레드의 사용량만 반환한다.
+            사용자가 없는 턴이나 다른 사용자의 턴이 섞여 있으면 소유자를 확정할 수 없으므로 없는 것으로 본다.
+        """
+        entry = self._threads.get(thread_id)
+
+        if entry is None or not user_id or any(turn["user_id"] != user_id for turn in entry["turns"]):
+            return None
+
+        return {"thread_id": thread_id, **entry}
+
+usage_ledger = UsageLedger()
+
+def node_of(metadata: Optional[Dict[str, Any]]) -> str:
+    """서브그래프 안의 호출도 최상위 그래프 노드(에이전트)로 묶는다."""
+    metadata = metadata or {}
+
+    if metadata.get("zenior_node"):
+        # 그래프 밖에서 미리 실행한 워커 (graph.speculation)
+        return metadata["zenior_node"]
+
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+
+    if namespace:
+        return namespace.split("|", 1)[0].split(":", 1)[0]
+
+    return metadata.get("langgraph_node") or "unknown"
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """
+        그래프 실행 config 의 callbacks 에 넣어 모든 ChatOpenAI 응답의 usage_metadata 를 기록한다.
+        요청마다 하나씩 만든다.
+    """
+    run_inline = True
+
+    def __init__(self, thread_id: Optional[str], user_id: Optional[str], ledger: UsageLedger = usage_ledger):
+        self.thread_id = thread_id
+        self.user_id = user_id
+        self.ledger = ledger
+        self._runs: Dict[UUID, Tuple[str, str]] = {}
+
+        if thread_id:
+            ledger.start_turn(thread_id, user_id)
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        self._runs[run_id] = (node_of(metadata), (metadata or {}).get("ls_model_name") or "")
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._runs.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        node, model = self._runs.pop(run_id, ("unknown", ""))
+
+        for generations in response.generations:
+            for generation in generations:
+                if not isinstance(generation, ChatGeneration):
+                    continue
+
+                usage_metadata = getattr(generation.message, "usage_metadata", None)
+
+                if not usage_metadata:
+                    continue
+
+                model = generation.message.response_metadata.get("model_name") or model
+                self._record(node, model, usage_metadata)
+
+    def _record(self, node: str, model: str, usage_metadata: Dict[str, Any]):
+        input_tokens = usage_metadata.get("input_tokens", 0)
+        output_tokens = usage_metadata.get("output_tokens", 0)
+        cache_read_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+        cost = estimate_cost(model, input_tokens, output_tokens, cache_read_tokens)
+
+        usage = {
+            "calls": 1,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "total_tokens": usage_metadata.get("total_tokens", input_tokens + output_tokens),
+            "cost_usd": cost,
+        }
+
+        if self.thread_id:
+            self.ledger.record(self.thread_id, self.user_id, node, usage)
+
+        LLM_CALLS.inc(node=node, model=model)
+        LLM_COST.inc(cost, node=node, model=model)
+
+        for kind in ("input", "output", "cache_read"):
+            LLM_TOKENS.inc(usage[f"{kind}_tokens"], node=node, model=model, type=kind)
+
+def user_id_of(config: Optional[dict]) -> Optional[str]:
+    return (config or {}).get("configurable", {}).get("user_id")
+
+BUDGET_MESSAGES = {
+    "user": "오늘 사용할 수 있는 토큰 한도를 모두 사용해 작업을 중단했습니다. 내일 다시 시도해 주세요.",
+    "turn": "이번 요청이 토큰 한도를 넘어 작업을 중단했습니다. 지금까지의 결과를 확인하고 요청을 나누어 다시 시도해 주세요.",
+}
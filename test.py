@@ -1,47 +1,70 @@
-from src.agents import create_graph
+"""
+재생(replay) 기반 오프라인 벤치마크.
+
+test_cases.json 의 시나리오를 create_scrum_agent_graph 로 실행한다.
+LLM 은 시나리오에 기록된 응답을 돌려주는 ReplayChatModel, MCP 는 로컬 스텁 서버로 대신하므로
+네트워크나 OpenAI 키 없이 돌릴 수 있다. interrupt 로 멈추면 steps 의 응답으로 재개하고,
+시나리오별 지연 시간 분포, LLM 호출 수, 토큰, 체크포인트 크기를 보고한다.
+시나리오에 "expect" 가 있으면 끝난 뒤 MCP 스텁의 데이터와 비교해 맞지 않으면 실패로 표시한다.
+체크포인트 메타데이터에 사용자 토큰이 남아 있어도 실패로 표시한다.
+시나리오가 끝나면 보존 정책(CHECKPOINT_KEEP_LAST, 기본 3)으로 압축하고, 끝난 서브그래프 namespace 나
+한도를 넘는 체크포인트가 남아 있거나 압축 뒤 상태를 읽을 수 없으면 실패로 표시한다.
+체크포인트를 읽을 때 직렬화 allowlist 에 없는 타입이 나와도 실패로 표시한다.
+
+사용법: python test.py [--test-cases test_cases.json] [--output results.json] [--quiet]
+                       [--concurrency 4] [--repeat 10] [--llm-latency-ms 0] [--mcp-latency-ms 0]
+"""
+import argparse
 import asyncio
-from langgraph.graph.state import RunnableConfig
-from langchain_core.messages import HumanMessage, AIMessage
-from src.utils import ainvoke_graph
-import uuid
-from dotenv import load_dotenv
-from typing import List, Dict, Any, Optional
 import json
+import logging
 import os
-import argparse
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
 from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "src"))
 
-load_dotenv()
+from langchain_core.messages import AIMessage, HumanMessage
+
+REPLAY_TOKEN = "replay-token"
+REPLAY_USER = "replay-user"
 
 def load_test_cases(json_path: str = "test_cases.json") -> List[Dict[str, Any]]:
     """
     JSON 파일에서 테스트 케이스를 로드합니다.
-    
+
     Args:
         json_path: JSON 파일 경로 (기본값: test_cases.json)
-    
+
     Returns:
         테스트 케이스 리스트
-    
+
     Raises:
         FileNotFoundError: JSON 파일이 없을 때
         json.JSONDecodeError: JSON 파싱 오류 시
     """
     json_file = Path(json_path)
-    
+
     if not json_file.exists():
         raise FileNotFoundError(
             f"테스트 케이스 파일을 찾을 수 없습니다: {json_path}\n"
             f"기본 파일을 생성하려면 'test_cases.json' 파일을 생성하세요."
         )
-    
+
     with open(json_file, "r", encoding="utf-8") as f:
         data = json.load(f)
-    
+
     # JSON 구조 검증
     if not isinstance(data, list):
         raise ValueError("JSON 파일은 테스트 케이스 배열이어야 합니다.")
-    
+
     # 각 테스트 케이스 검증
     for i, test_case in enumerate(data):
         if not isinstance(test_case, dict):
@@ -54,244 +77,326 @@ def load_test_cases(json_path: str = "test_cases.json") -> List[Dict[str, Any]]:
             raise ValueError(f"테스트 케이스 {i+1}번에 'steps' 필드가 없습니다.")
         if not isinstance(test_case["steps"], list):
             raise ValueError(f"테스트 케이스 {i+1}번의 'steps'가 배열이 아닙니다.")
-        
+        if not isinstance(test_case.get("llm", {}), dict):
+            raise ValueError(f"테스트 케이스 {i+1}번의 'llm'이 노드별 응답 목록 딕셔너리가 아닙니다.")
+
         # 각 step 검증
         for j, step in enumerate(test_case["steps"]):
             if not isinstance(step, dict):
                 raise ValueError(f"테스트 케이스 {i+1}번의 step {j+1}번이 딕셔너리가 아닙니다.")
             if "response" not in step:
                 raise ValueError(f"테스트 케이스 {i+1}번의 step {j+1}번에 'response' 필드가 없습니다.")
-    
+
     return data
 
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+async def run_turn(graph, run_input, config: Dict[str, Any]) -> Dict[str, float]:
+    """/assistant 와 같은 방식으로 스트리밍하며 한 턴을 실행한다."""
+    started = time.perf_counter()
+    first_event = None
+    events = 0
+
+    async for _ in graph.astream(run_input, config, stream_mode=["messages", "updates"], subgraphs=True):
+        events += 1
+
+        if first_event is None:
+            first_event = time.perf_counter() - started
+
+    return {
+        "latency": time.perf_counter() - started,
+        "first_event": first_event or 0.0,
+        "events": events,
+    }
+
+async def checkpoint_stats(graph, config: Dict[str, Any]) -> Dict[str, float]:
+    checkpointer = graph.checkpointer
+    latest = await checkpointer.aget_tuple(config)
+    count = 0
+    token_leaks = 0
+
+    async for checkpoint_tuple in checkpointer.alist(config):
+        count += 1
+
+        # 사용자 토큰이 체크포인트 메타데이터로 저장되면 안 된다.
+        if REPLAY_TOKEN in json.dumps(checkpoint_tuple.metadata, default=str):
+            token_leaks += 1
+
+    latest_bytes = len(checkpointer.serde.dumps_typed(latest.checkpoint)[1]) if latest else 0
+
+    return {"checkpoints": count, "checkpoint_kb": latest_bytes / 1024, "token_leaks": token_leaks}
 
 async def run_test_case(
     test_case: Dict[str, Any],
-    config: RunnableConfig,
+    graph,
+    model,
     verbose: bool = True
 ) -> Dict[str, Any]:
     """
-    단일 테스트 케이스를 실행합니다.
-    
+    단일 테스트 케이스를 한 번 재생합니다.
+
     Args:
-        test_case: 테스트 케이스 딕셔너리 (name, initial_message, steps)
-        config: RunnableConfig
+        test_case: 테스트 케이스 딕셔너리 (name, initial_message, steps, llm)
+        graph: 컴파일된 스크럼 그래프
+        model: 그래프에 주입된 ReplayChatModel
         verbose: 상세 출력 여부
-    
+
     Returns:
         테스트 결과 딕셔너리
     """
-    if verbose:
-        print("\n" + "=" * 80)
-        print(f"🧪 테스트 케이스: {test_case['name']}")
-        print("=" * 80)
-    
-    graph = await create_graph(config=config)
-    step_index = 0
-    all_steps_completed = []
-    
-    # 초기 메시지로 시작
-    current_inputs = {
-        "messages": [HumanMessage(content=test_case["initial_message"])]
+    from langgraph.types import Command
+
+    from graph import has_pending_interrupt, run_deadline
+    from team.mcp_utils import BearerToken
+    from usage import UsageCallbackHandler, usage_ledger
+
+    thread_id = str(uuid.uuid4())
+    model.load(thread_id, test_case.get("llm", {}))
+
+    steps = list(test_case["steps"])
+    run_input: Any = {"messages": [HumanMessage(content=test_case["initial_message"])]}
+    turns = []
+    status = "completed"
+
+    while True:
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "token": BearerToken(REPLAY_TOKEN),
+                "user_id": REPLAY_USER,
+                "deadline": run_deadline(),
+            },
+            "callbacks": [UsageCallbackHandler(thread_id, REPLAY_USER)],
+        }
+
+        turns.append(await run_turn(graph, run_input, config))
+
+        interrupted = await has_pending_interrupt(graph.checkpointer, config)
+
+        if not steps:
+            if interrupted:
+                status = "interrupted"
+            break
+
+        response = steps.pop(0)["response"]
+
+        if verbose:
+            print(f"   💬 {'재개' if interrupted else '후속 요청'}: {response}")
+
+        run_input = Command(resume=response) if interrupted else {"messages": [HumanMessage(content=response)]}
+
+    state = await graph.aget_state(config)
+    messages = state.values.get("messages", [])
+    final = next((m for m in reversed(messages) if isinstance(m, AIMessage) and m.content), None)
+    usage = usage_ledger.get(thread_id) or {}
+
+    return {
+        "thread_id": thread_id,
+        "status": status,
+        "turns": turns,
+        "llm_calls": model.calls(thread_id),
+        "tokens": (usage.get("total") or {}).get("total_tokens", 0),
+        "by_node": {node: totals["total_tokens"] for node, totals in (usage.get("by_node") or {}).items()},
+        "final_message": str(final.content)[:200] if final else None,
+        **await checkpoint_stats(graph, config),
     }
-    
-    if verbose:
-        print(f"\n📝 초기 메시지: {test_case['initial_message']}")
-        print("-" * 80)
-    
-    # 그래프 실행 및 단계별 진행
-    max_iterations = 50  # 무한 루프 방지
-    iteration = 0
-    
-    while iteration < max_iterations:
-        iteration += 1
-        
-        # 그래프 실행 (스트리밍 완료까지 대기)
-        await ainvoke_graph(graph, current_inputs, config)
-        
-        # 상태 확인
-        state = graph.get_state(config)
-        state_values = state.values if hasattr(state, 'values') else {}
-        
-        # 사용자 입력이 필요한지 확인
-        needs_user_input = state_values.get("needs_user_input", False)
-        user_question = state_values.get("user_question")
-        
-        if needs_user_input and user_question:
-            if verbose:
-                print(f"\n❓ [단계 {step_index + 1}] 에이전트 질문: {user_question}")
-            
-            # 테스트 케이스에 정의된 응답이 있는지 확인
-            if step_index < len(test_case["steps"]):
-                user_response = test_case["steps"][step_index]["response"]
-                if verbose:
-                    print(f"💬 [단계 {step_index + 1}] 사용자 응답: {user_response}")
-                
-                # 다음 단계를 위해 사용자 응답을 메시지로 추가
-                current_inputs = {
-                    "messages": [HumanMessage(content=user_response)]
-                }
-                
-                all_steps_completed.append({
-                    "step": step_index + 1,
-                    "question": user_question,
-                    "response": user_response
-                })
-                
-                step_index += 1
-            else:
-                # 정의된 응답이 없으면 기본값 사용
-                if verbose:
-                    print(f"⚠️  테스트 케이스에 정의된 응답이 없습니다. 기본 응답을 사용합니다.")
-                user_response = "알겠습니다."
-                current_inputs = {
-                    "messages": [HumanMessage(content=user_response)]
-                }
-                all_steps_completed.append({
-                    "step": step_index + 1,
-                    "question": user_question,
-                    "response": user_response
-                })
-                step_index += 1
-        else:
-            # 완료 또는 다음 단계로 진행
-            next_nodes = state.next if hasattr(state, 'next') else []
-            
-            # 완료 확인: next가 없거나 END인 경우
-            if not next_nodes:
-                # 테스트 완료
-                if verbose:
-                    print("\n✅ 테스트 케이스 완료")
-                    print("-" * 80)
-                
-                # 최종 메시지 확인
-                messages = state_values.get("messages", [])
-                final_messages = []
-                for msg in messages[-5:]:  # 마지막 5개 메시지만
-                    if isinstance(msg, AIMessage):
-                        content = str(msg.content)
-                        final_messages.append({
-                            "type": "ai",
-                            "content": content[:200] + "..." if len(content) > 200 else content
-                        })
-                    elif isinstance(msg, HumanMessage):
-                        content = str(msg.content)
-                        final_messages.append({
-                            "type": "human",
-                            "content": content[:200] + "..." if len(content) > 200 else content
-                        })
-                
-                return {
-                    "test_case_name": test_case["name"],
-                    "status": "completed",
-                    "steps_completed": all_steps_completed,
-                    "total_steps": len(test_case["steps"]),
-                    "final_messages": final_messages,
-                    "state_summary": {
-                        "has_sprints": bool(state_values.get("sprints")),
-                        "has_tasks": bool(state_values.get("tasks")),
-                        "has_epics": bool(state_values.get("epics")),
-                        "has_user_stories": bool(state_values.get("user_stories")),
-                    }
-                }
-            else:
-                # 다음 노드로 진행 중 - 사용자 입력이 필요하지 않으면 계속 진행
-                if verbose:
-                    print(f"\n🔄 다음 노드로 진행 중... (next: {next_nodes})")
-                # 다음 실행을 위해 빈 입력 사용 (상태가 이미 업데이트됨)
-                current_inputs = {"messages": []}
-    
-    # 최대 반복 횟수 초과
-    if verbose:
-        print(f"\n⚠️  최대 반복 횟수({max_iterations})에 도달했습니다.")
-    
+
+def summarize(name: str, runs: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    ok = [run for run in runs if run.get("status") != "error"]
+    turn_latencies = [turn["latency"] for run in ok for turn in run["turns"]]
+    first_events = [turn["first_event"] for run in ok for turn in run["turns"]]
+    run_latencies = [sum(turn["latency"] for turn in run["turns"]) for run in ok]
+
+    def mean(key: str) -> float:
+        return statistics.mean(run[key] for run in ok) if ok else 0.0
+
     return {
-        "test_case_name": test_case["name"],
-        "status": "max_iterations_reached",
-        "steps_completed": all_steps_completed,
-        "total_steps": len(test_case["steps"]),
+        "test_case_name": name,
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "statuses": sorted({run["status"] for run in runs}),
+        "throughput_rps": len(ok) / wall if wall else 0.0,
+        "turn_ms": {q: percentile(turn_latencies, v) * 1000 for q, v in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "first_event_ms_p50": percentile(first_events, 0.5) * 1000,
+        "run_ms": {q: percentile(run_latencies, v) * 1000 for q, v in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "llm_calls": mean("llm_calls"),
+        "tokens": mean("tokens"),
+        "checkpoints": mean("checkpoints"),
+        "checkpoint_kb": mean("checkpoint_kb"),
+        "token_leaks": sum(run.get("token_leaks", 0) for run in ok),
+        "by_node": ok[0]["by_node"] if ok else {},
+        "final_message": ok[0]["final_message"] if ok else None,
+        "error": next((run["error"] for run in runs if run.get("status") == "error"), None),
     }
 
+async def check_compaction(graph, runs: List[Dict[str, Any]]) -> List[str]:
+    """보존 정책으로 압축한 뒤 각 스레드에 남은 체크포인트를 namespace 별로 확인한다."""
+    from graph.retention import CHECKPOINT_KEEP_LAST, CheckpointRetention
+
+    await CheckpointRetention(graph.checkpointer).compact()
+    unmet = []
+
+    for run in runs:
+        if run.get("status") == "error":
+            continue
+
+        config = {"configurable": {"thread_id": run["thread_id"]}}
+        by_ns = Counter()
+
+        async for checkpoint_tuple in graph.checkpointer.alist(config):
+            by_ns[checkpoint_tuple.config["configurable"].get("checkpoint_ns", "")] += 1
+
+        subgraphs = [checkpoint_ns for checkpoint_ns in by_ns if checkpoint_ns]
+
+        # interrupt 로 멈춘 스레드는 재개할 서브그래프가 남아 있어야 한다.
+        if subgraphs and run["status"] == "completed":
+            unmet.append(f"압축 후 끝난 서브그래프 namespace {len(subgraphs)}개가 남음")
+
+        if any(count > CHECKPOINT_KEEP_LAST for count in by_ns.values()):
+            unmet.append(f"압축 후 namespace 별 체크포인트 {dict(by_ns)} 가 {CHECKPOINT_KEEP_LAST}개를 넘음")
+
+        if not (await graph.aget_state(config)).values.get("messages"):
+            unmet.append("압축 후 스레드 상태를 읽을 수 없음")
+
+    return list(dict.fromkeys(unmet))
+
+def check_expectations(expect: Dict[str, Any], store) -> List[str]:
+    """시나리오의 expect 조건 중 MCP 스텁의 최종 데이터와 맞지 않는 항목을 설명과 함께 반환한다."""
+    unmet = []
+
+    for project_id, titles in (expect.get("backlog_titles") or {}).items():
+        actual = store.backlog_titles(project_id)
+
+        if actual != sorted(set(titles)):
+            unmet.append(f"{project_id} 백로그: 기대 {sorted(set(titles))}, 실제 {actual}")
+
+    return unmet
 
 async def run_all_tests(
     test_cases: List[Dict[str, Any]],
+    concurrency: int = 1,
+    repeat: int = 1,
+    llm_latency_ms: float = 0.0,
+    mcp_latency_ms: float = 0.0,
     verbose: bool = True
 ) -> List[Dict[str, Any]]:
     """
-    모든 테스트 케이스를 실행합니다.
-    
-    Args:
-        test_cases: 테스트 케이스 리스트
-        verbose: 상세 출력 여부
-    
+    모든 테스트 케이스를 repeat 번씩, 최대 concurrency 개를 동시에 재생합니다.
+
     Returns:
-        테스트 결과 리스트
+        시나리오별 결과 요약 리스트
     """
-    results = []
-    
-    for i, test_case in enumerate(test_cases, 1):
-        # 각 테스트 케이스마다 새로운 thread_id 사용
-        config = {
-            "configurable": {
-                "thread_id": str(uuid.uuid4()),
-                "token": "eyJraWQiOiJRTHVWR1J4amJ4cVZwSUVHZWJTdWpvQWdjc1JOZ2FhckVucWFQcFJMRUM4PSIsImFsZyI6IlJTMjU2In0.eyJzdWIiOiJmNDk4YWQ3Yy0wMGIxLTcwNGUtMWEzYS1jMjRlOTJlMzdhNjUiLCJjb2duaXRvOmdyb3VwcyI6WyJhcC1ub3J0aGVhc3QtMl93VWVOTlN5RGRfR29vZ2xlIl0sImlzcyI6Imh0dHBzOlwvXC9jb2duaXRvLWlkcC5hcC1ub3J0aGVhc3QtMi5hbWF6b25hd3MuY29tXC9hcC1ub3J0aGVhc3QtMl93VWVOTlN5RGQiLCJ2ZXJzaW9uIjoyLCJjbGllbnRfaWQiOiIxcHF0YWRzc2llOWp2ZXQzZmZkZzI2cnZpNiIsIm9yaWdpbl9qdGkiOiJjMjVmZWZiOC0wMjJhLTRmOGQtYTYxMS02OGJjMzc2MDBkNGMiLCJ0b2tlbl91c2UiOiJhY2Nlc3MiLCJzY29wZSI6Im9wZW5pZCBlbWFpbCIsImF1dGhfdGltZSI6MTc2Mzk1Njk4OSwiZXhwIjoxNzY0MDA5MjY4LCJpYXQiOjE3NjQwMDU2NjgsImp0aSI6IjJjZDJiZGI0LTdmMTMtNGEyNC05NmZlLTY1NTI0NWJjNmNjNiIsInVzZXJuYW1lIjoiZ29vZ2xlXzExMzQwOTAwMTQ4NjAyMzM0ODUwNyJ9.igBZe_9GXuL_oeRLsb59RqXF-WyrbwBZWoTU1Ere1dJN-koTDW5eYKtIPfrArJ_3nJcuc2UghMsrJMSX2R8-CqbS1ZELuoc1rhLYGynv-ZCgfaBqMvVHeK8tLcE_tSFbwim-61XVvnotYl_ZlZ0fJ6fNB1YSJOTHYaH40G8kGzuipJF1UKAa_Z6QTXt5dMEjlZut17RHJUa-vWdG_tE0AMT0Fn9L5OBepYUbknknM6H6ynkOSOf11olkLSVBE9RKCOAUFvmg0-oyySQ4sEwthLOhJBerhizU03rGm4rFBL_9zDYWeLL8sFIwvrKfZR9xD7kspaFbIfXd0fwGyIcRVw"
-            }
-        }
-        
-        try:
-            result = await run_test_case(test_case, config, verbose)
-            result["test_index"] = i
-            results.append(result)
-        except Exception as e:
+    from benchmarks.replay import ReplayChatModel, start_mcp_stub
+
+    mcp_url, store, server = start_mcp_stub(mcp_latency_ms)
+    os.environ["ZENIOR_MCP_SERVER_URL"] = mcp_url
+
+    from langgraph.checkpoint.serde.event_hooks import register_serde_event_listener
+
+    from graph import close_checkpointer, create_scrum_agent_graph, open_checkpointer
+    from llm import set_chat_model_override
+    from team.mcp_utils import close_mcp_pool
+
+    # 그래프의 모든 LLM(에이전트, Supervisor, 요약)이 재생 모델을 쓰게 한다.
+    model = ReplayChatModel(latency_ms=llm_latency_ms)
+    set_chat_model_override(model)
+    await open_checkpointer()
+
+    # LANGGRAPH_STRICT_MSGPACK 에서 막히는(기본 설정에서는 경고만 나는) 타입이 체크포인트에 들어갔는지 모은다.
+    unregistered_types = set()
+    unregister = register_serde_event_listener(
+        lambda event: event["kind"] in ("msgpack_unregistered_allowed", "msgpack_blocked")
+        and unregistered_types.add(f"{event['module']}.{event['name']}")
+    )
+
+    try:
+        graph = await create_scrum_agent_graph({"configurable": {"token": REPLAY_TOKEN}})
+        semaphore = asyncio.Semaphore(concurrency)
+        results = []
+
+        for i, test_case in enumerate(test_cases, 1):
             if verbose:
-                print(f"\n❌ 테스트 케이스 실행 중 오류 발생: {str(e)}")
-            results.append({
-                "test_case_name": test_case["name"],
-                "test_index": i,
-                "status": "error",
-                "error": str(e)
-            })
-    
-    return results
+                print("\n" + "=" * 80)
+                print(f"🧪 테스트 케이스: {test_case['name']} (x{repeat}, 동시 {concurrency})")
+                print("=" * 80)
+
+            async def replay():
+                async with semaphore:
+                    try:
+                        return await run_test_case(test_case, graph, model, verbose and repeat == 1)
+                    except Exception as e:
+                        if verbose:
+                            print(f"\n❌ 테스트 케이스 실행 중 오류 발생: {e!r}")
+                        return {"status": "error", "error": repr(e)}
+
+            store.reset()
+            unregistered_types.clear()
+            started = time.perf_counter()
+            runs = await asyncio.gather(*(replay() for _ in range(repeat)))
+            summary = summarize(test_case["name"], runs, time.perf_counter() - started)
+            summary["test_index"] = i
+            summary["mcp_calls"] = dict(store.calls)
+            summary["unmet"] = [
+                *check_expectations(test_case.get("expect") or {}, store),
+                *await check_compaction(graph, runs),
+            ]
+
+            if summary["token_leaks"]:
+                summary["unmet"].append(f"체크포인트 {summary['token_leaks']}개의 메타데이터에 사용자 토큰이 저장됨")
+
+            if unregistered_types:
+                summary["unmet"].append(f"체크포인트에 allowlist 에 없는 타입이 저장됨: {sorted(unregistered_types)}")
+            results.append(summary)
 
+        return results
+    finally:
+        unregister()
+        await close_mcp_pool()
+        await close_checkpointer()
+        set_chat_model_override(None)
+        server.should_exit = True
 
 def print_test_summary(results: List[Dict[str, Any]]):
     """테스트 결과 요약을 출력합니다."""
     print("\n" + "=" * 80)
-    print("📊 테스트 결과 요약")
+    print("📊 벤치마크 결과 요약")
     print("=" * 80)
-    
+
     for result in results:
-        status_emoji = "✅" if result.get("status") == "completed" else "❌"
-        print(f"\n{status_emoji} {result.get('test_index', '?')}. {result.get('test_case_name', 'Unknown')}")
-        print(f"   상태: {result.get('status', 'unknown')}")
-        
-        if result.get("status") == "completed":
-            steps = result.get("steps_completed", [])
-            print(f"   완료된 단계: {len(steps)}/{result.get('total_steps', 0)}")
-            state_summary = result.get("state_summary", {})
-            if any(state_summary.values()):
-                print(f"   생성된 데이터: ", end="")
-                data_types = []
-                if state_summary.get("has_sprints"):
-                    data_types.append("스프린트")
-                if state_summary.get("has_tasks"):
-                    data_types.append("태스크")
-                if state_summary.get("has_epics"):
-                    data_types.append("에픽")
-                if state_summary.get("has_user_stories"):
-                    data_types.append("사용자 스토리")
-                print(", ".join(data_types) if data_types else "없음")
-        elif result.get("status") == "error":
-            print(f"   오류: {result.get('error', 'Unknown error')}")
-    
-    print("\n" + "=" * 80)
+        passed = not result["errors"] and result["statuses"] == ["completed"] and not result.get("unmet")
+        status_emoji = "✅" if passed else "❌"
+        print(f"\n{status_emoji} {result['test_index']}. {result['test_case_name']}")
+        print(f"   상태: {', '.join(result['statuses'])} (실행 {result['runs']}회, 오류 {result['errors']}회)")
+
+        if result.get("error"):
+            print(f"   오류: {result['error']}")
+            continue
 
+        for unmet in result.get("unmet") or []:
+            print(f"   검증 실패: {unmet}")
+
+        turn, run = result["turn_ms"], result["run_ms"]
+        print(f"   턴 지연: p50 {turn['p50']:.1f}ms / p95 {turn['p95']:.1f}ms / p99 {turn['p99']:.1f}ms"
+              f" (첫 이벤트 p50 {result['first_event_ms_p50']:.1f}ms)")
+        print(f"   시나리오 지연: p50 {run['p50']:.1f}ms / p95 {run['p95']:.1f}ms / p99 {run['p99']:.1f}ms"
+              f" ({result['throughput_rps']:.1f} runs/s)")
+        print(f"   LLM 호출: {result['llm_calls']:.1f}회, 토큰: {result['tokens']:.0f}"
+              f" ({', '.join(f'{node} {tokens}' for node, tokens in result['by_node'].items())})")
+        print(f"   체크포인트: {result['checkpoints']:.0f}개, 최신 {result['checkpoint_kb']:.1f}KB")
+        print(f"   MCP 호출: {sum(result['mcp_calls'].values())}회")
+
+    print("\n" + "=" * 80)
 
 async def main():
     """메인 함수"""
     # 명령줄 인자 파싱
-    parser = argparse.ArgumentParser(description="에이전트 테스트 스크립트")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument(
         "--test-cases",
         type=str,
@@ -309,32 +414,59 @@ async def main():
         action="store_true",
         help="상세 출력 비활성화"
     )
-    
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 재생할 시나리오 수")
+    parser.add_argument("--repeat", type=int, default=1, help="시나리오별 반복 횟수")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="LLM 응답마다 넣을 지연 시간(ms)")
+    parser.add_argument("--mcp-latency-ms", type=float, default=0.0, help="MCP 툴 호출마다 넣을 지연 시간(ms)")
+    parser.add_argument("--checkpointer", type=str, default="sqlite", choices=["memory", "sqlite"],
+                        help="체크포인터 백엔드 (sqlite 는 임시 파일에 저장)")
+
     args = parser.parse_args()
-    
+
+    # 그래프 모듈은 import 시점에 환경 변수를 읽으므로 먼저 설정한다.
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["CHECKPOINTER_BACKEND"] = args.checkpointer
+    os.environ["CHECKPOINTER_URL"] = os.path.join(tmp.name, "replay.sqlite")
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    os.environ.setdefault("METRICS_OTEL_ENABLED", "false")
+    # 압축 검증에서 최신 체크포인트만 남기는 경로까지 거치도록 작게 잡는다.
+    os.environ.setdefault("CHECKPOINT_KEEP_LAST", "3")
+
+    # 스텁 서버와 MCP 클라이언트의 요청 로그는 결과를 가리므로 숨긴다.
+    for name in ("httpx", "mcp"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
     try:
         # 테스트 케이스 로드
         print(f"📂 테스트 케이스 파일 로드 중: {args.test_cases}")
         test_cases = load_test_cases(args.test_cases)
         print(f"✅ {len(test_cases)}개의 테스트 케이스를 로드했습니다.\n")
-        
-        print("🚀 테스트 스크립트 시작")
-        print(f"📋 총 {len(test_cases)}개의 테스트 케이스가 있습니다.\n")
-        
+
+        print("🚀 재생 벤치마크 시작")
+
         # 모든 테스트 실행
-        results = await run_all_tests(test_cases, verbose=not args.quiet)
-        
+        results = await run_all_tests(
+            test_cases,
+            concurrency=args.concurrency,
+            repeat=args.repeat,
+            llm_latency_ms=args.llm_latency_ms,
+            mcp_latency_ms=args.mcp_latency_ms,
+            verbose=not args.quiet,
+        )
+
         # 결과 요약 출력
-        if not args.quiet:
-            print_test_summary(results)
-        
+        print_test_summary(results)
+
         # JSON 파일로 결과 저장 (선택사항)
         if args.output:
             output_path = Path(args.output)
             with open(output_path, "w", encoding="utf-8") as f:
                 json.dump(results, f, ensure_ascii=False, indent=2)
             print(f"\n💾 테스트 결과가 저장되었습니다: {output_path}")
-        
+
+        if any(result["errors"] or result.get("unmet") for result in results):
+            return 1
+
     except FileNotFoundError as e:
         print(f"❌ 오류: {e}")
         print("\n💡 예시 JSON 파일을 생성하려면 'test_cases.json' 파일을 생성하세요.")
@@ -347,10 +479,12 @@ async def main():
         import traceback
         traceback.print_exc()
         return 1
-    
+    finally:
+        tmp.cleanup()
+
     return 0
 
 
 if __name__ == "__main__":
     exit_code = asyncio.run(main())
-    exit(exit_code)
\ No newline at end of file
+    exit(exit_code)